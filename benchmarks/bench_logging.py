@@ -0,0 +1,86 @@
+"""Benchmark analysis-logging latency on the request path with a slow log sink.
+
+Logs the same analysis events through the inline ``StreamHandler`` and the
+background ``AsyncJSONHandler``, writing to a stream that stalls on every
+write (as stdout does under container log-driver backpressure), and reports
+the time each ``log_analysis``-style call took on the caller's thread.
+
+Usage:
+    python -m benchmarks.bench_logging [stall ms per write]
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+import statistics
+import sys
+import time
+
+from detector.logging_.schemas import AnalysisLogEvent
+from detector.logging_.structured_logger import AsyncJSONHandler, JSONFormatter
+
+EVENTS = 2_000
+
+
+class SlowStream(io.StringIO):
+    def __init__(self, stall_seconds: float):
+        super().__init__()
+        self.stall = stall_seconds
+
+    def write(self, text: str) -> int:
+        time.sleep(self.stall)
+        return super().write(text)
+
+
+def _event(i: int) -> AnalysisLogEvent:
+    return AnalysisLogEvent.from_analysis(
+        prompt_hash=f"{i:064x}",
+        prompt_length=120,
+        verdict="MALICIOUS",
+        confidence=0.92,
+        primary_category="role_override",
+        triggered_detectors=["regex", "heuristic", "ml_classifier"],
+        detector_confidences={"regex": 0.95, "heuristic": 0.6, "ml_classifier": 0.97},
+        latency_ms=1.5,
+        source_ip="10.0.0.1",
+        model_version="abc123def456",
+    )
+
+
+def _run(name: str, handler: logging.Handler) -> None:
+    handler.setFormatter(JSONFormatter())
+    logger = logging.getLogger(f"bench.{name}")
+    logger.handlers = [handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    latencies = []
+    for i in range(EVENTS):
+        event = _event(i)
+        started = time.perf_counter()
+        logger.info("Analysis: %s", event.verdict, extra={"event_data": event})
+        latencies.append(time.perf_counter() - started)
+    drain_started = time.perf_counter()
+    handler.close()
+    drain = time.perf_counter() - drain_started
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99)]
+    dropped = handler.stats()["dropped"] if isinstance(handler, AsyncJSONHandler) else 0
+    print(
+        f"{name:>6}: mean {statistics.fmean(latencies) * 1e6:>8.1f}us  "
+        f"p99 {p99 * 1e6:>8.1f}us  max {latencies[-1] * 1e6:>9.1f}us  "
+        f"drain {drain * 1e3:>7.1f}ms  dropped {dropped}"
+    )
+
+
+def main():
+    stall_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    print(f"{EVENTS} events, sink stalls {stall_ms}ms per write")
+    _run("sync", logging.StreamHandler(SlowStream(stall_ms / 1000)))
+    _run("async", AsyncJSONHandler(SlowStream(stall_ms / 1000)))
+
+
+if __name__ == "__main__":
+    main()
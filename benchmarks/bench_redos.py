@@ -0,0 +1,91 @@
+"""Fuzz every injection pattern with adversarial inputs and report its worst-case scan time.
+
+Backtracking blow-ups come from long repetitive prompts, so each input
+repeats a short motif up to the target length. Motifs are drawn from the
+pattern's own required literals (so they get past the pattern-set prefilter)
+and from characters that the library's unbounded runs match, and are mixed
+at random with a fixed seed. For each pattern the table shows the slowest
+input found, with the time of a plain ``search`` and of the search the
+regex detector runs without a time budget (guarded patterns search
+overlapping slices of ``regex_guarded_max_chars`` characters).
+
+Usage:
+    python -m benchmarks.bench_redos [length] [motifs per pattern]
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import time
+from functools import partial
+
+from detector.config import settings
+from detector.patterns.injection_patterns import ALL_PATTERNS
+from detector.patterns.pattern_set import RUN_CHARS, PatternSet, max_match_chars, search_slices
+
+# Fragments that exercise the library's runs: whitespace, separators, quotes,
+# speaker turns, encoded characters and hypothetical framing
+GENERIC_TOKENS = [
+    " ", "\n", "\t", ":", '"', '"""', "#", "###", "-", "=", "-----", "A", "aGk=", "\\x41",
+    "\\u0041", "%41", "user: ", "assistant:", "what if ", "you are ", "ignore ", "[", "<", "{",
+]
+
+
+def _motifs(literals: list[str], count: int, rng: random.Random) -> list[str]:
+    """Short token sequences to repeat, leaning towards the pattern's literals."""
+    pool = literals * 3 + GENERIC_TOKENS
+    motifs = list(dict.fromkeys(literals + GENERIC_TOKENS))
+    while len(motifs) < count:
+        motifs.append("".join(rng.choice(pool) for _ in range(rng.randint(1, 4))))
+    return motifs
+
+
+def _repeat(motif: str, length: int) -> str:
+    return (motif * (length // len(motif) + 1))[:length]
+
+
+def _search_seconds(search, text: str, repeat: int = 3) -> float:
+    """Best of ``repeat`` timings, so one-off stalls don't pass for backtracking."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        search(text)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    length = int(sys.argv[1]) if len(sys.argv) > 1 else 8_192
+    motif_count = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    pattern_set = PatternSet(ALL_PATTERNS)
+    guarded_max_chars = settings.regex_guarded_max_chars or None
+    rng = random.Random(0)
+
+    rows = []
+    for index, pattern in enumerate(pattern_set.patterns):
+        literals = sorted(frozenset().union(*pattern_set.requirements[index]))
+        worst, worst_motif = 0.0, ""
+        for motif in _motifs(literals, motif_count, rng):
+            seconds = _search_seconds(pattern.pattern.search, _repeat(motif, length))
+            if seconds > worst:
+                worst, worst_motif = seconds, motif
+        guarded = index in pattern_set.guarded
+        search = pattern.pattern.search
+        if guarded and guarded_max_chars:
+            overlap = max_match_chars(pattern.pattern, RUN_CHARS)
+            search = partial(search_slices, pattern.pattern, slice_chars=guarded_max_chars,
+                             overlap=overlap)
+        scanned = _search_seconds(search, _repeat(worst_motif, length))
+        rows.append((worst, scanned, pattern.name, guarded, worst_motif))
+
+    print(f"{length}-character inputs, {motif_count} motifs per pattern; "
+          f"guarded patterns search {guarded_max_chars}-character slices\n")
+    print(f"{'pattern':<28} {'guarded':>7} {'worst search':>13} {'as scanned':>11}  worst motif")
+    for worst, scanned, name, guarded, motif in sorted(rows, reverse=True):
+        print(f"{name:<28} {'yes' if guarded else '':>7} {worst * 1e3:>11.2f}ms "
+              f"{scanned * 1e3:>9.2f}ms  {motif!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Benchmark AnalysisStore write throughput and read latency under concurrent writes.
+
+Compares the current store (persistent connections, WAL) with the previous
+behaviour of opening a fresh rollback-journal connection for every call.
+
+Usage:
+    python -m benchmarks.bench_store
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from detector.storage.sqlite_store import AnalysisStore
+
+INSERTS = 2_000
+READS = 200
+
+
+class ConnectPerCallStore(AnalysisStore):
+    """The store as it was before: a new default-journal connection per call."""
+
+    def __init__(self, db_path: str):
+        super().__init__(db_path)
+        self._writer.execute("PRAGMA journal_mode=DELETE")
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=5.0)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        return self._open()
+
+    def save_many(self, rows: list[dict]) -> None:
+        conn = self._open()
+        with conn:
+            conn.executemany(
+                "INSERT INTO analyses (timestamp, prompt_hash, prompt_length, verdict, confidence, "
+                "primary_category, triggered_detectors, explanation, latency_ms) "
+                "VALUES (datetime('now'), :prompt_hash, :prompt_length, :verdict, :confidence, "
+                ":primary_category, :triggered_detectors, :explanation, :latency_ms)",
+                rows,
+            )
+        conn.close()
+
+
+def _row(i: int) -> dict:
+    return {
+        "prompt_hash": f"{i:064x}",
+        "prompt_length": 42,
+        "verdict": ("CLEAN", "SUSPICIOUS", "MALICIOUS")[i % 3],
+        "confidence": 0.5,
+        "primary_category": "role_override",
+        "triggered_detectors": "regex",
+        "explanation": "benchmark row",
+        "latency_ms": 1.0,
+    }
+
+
+def _inserts_per_sec(store: AnalysisStore) -> float:
+    start = time.perf_counter()
+    for i in range(INSERTS):
+        store.save(**_row(i))
+    return INSERTS / (time.perf_counter() - start)
+
+
+def _read_latencies(store: AnalysisStore) -> list[float]:
+    """get_recent latencies (ms) while another thread inserts continuously."""
+    stop = threading.Event()
+
+    def write_forever():
+        i = 0
+        while not stop.is_set():
+            store.save(**_row(i))
+            i += 1
+
+    writer = threading.Thread(target=write_forever)
+    writer.start()
+    latencies = []
+    try:
+        for _ in range(READS):
+            start = time.perf_counter()
+            store.get_recent(limit=50)
+            latencies.append((time.perf_counter() - start) * 1000)
+    finally:
+        stop.set()
+        writer.join()
+    return latencies
+
+
+def main():
+    print(f"{'store':>18} {'inserts/sec':>12} {'read p50':>10} {'read p99':>10}")
+    stores = [("connect per call", ConnectPerCallStore), ("persistent + WAL", AnalysisStore)]
+    for label, factory in stores:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = factory(str(Path(tmp) / "bench.db"))
+            rate = _inserts_per_sec(store)
+            latencies = sorted(_read_latencies(store))
+            p99 = latencies[int(len(latencies) * 0.99) - 1]
+            print(
+                f"{label:>18} {rate:>12.0f} {statistics.median(latencies):>8.2f}ms {p99:>8.2f}ms"
+            )
+            store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Compare the vocabulary and hashing vectorizers on the same train/test split.
+
+Reports test F1, exported model size, load time and scoring latency for
+each, using the same array export the API serves from.
+
+Usage:
+    python -m ml.compare_vectorizers [--hash-bits N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import joblib
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import f1_score
+from sklearn.model_selection import train_test_split
+
+from detector.engine.array_model import ArrayModel, export_model
+from ml.train import build_vectorizer, load_data
+
+LATENCY_PROMPTS = 200
+BATCH_SIZE = 64
+
+
+def _size_kb(*paths: Path) -> float:
+    return sum(path.stat().st_size for path in paths) / 1024
+
+
+def _timed(fn, repeat: int = 5) -> float:
+    """Best wall time of ``repeat`` calls, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def _evaluate(vectorizer, train_texts, y_train, test_texts, y_test, directory: Path) -> dict:
+    model = LogisticRegression(max_iter=1000, C=1.0, class_weight="balanced")
+    model.fit(vectorizer.fit_transform(train_texts), y_train)
+    f1 = f1_score(y_test, model.predict(vectorizer.transform(test_texts)))
+
+    directory.mkdir()
+    joblib.dump(model, directory / "classifier.joblib")
+    joblib.dump(vectorizer, directory / "vectorizer.joblib")
+    export_model(vectorizer, model, directory / "arrays")
+    arrays = ArrayModel(directory / "arrays")
+
+    prompts = test_texts[:LATENCY_PROMPTS]
+    single_ms = _timed(lambda: [arrays.predict_proba([p]) for p in prompts]) / len(prompts)
+    batch_ms = _timed(
+        lambda: [
+            arrays.predict_proba(prompts[i:i + BATCH_SIZE])
+            for i in range(0, len(prompts), BATCH_SIZE)
+        ]
+    ) / len(prompts)
+    return {
+        "f1": f1,
+        "joblib_kb": _size_kb(directory / "classifier.joblib", directory / "vectorizer.joblib"),
+        "arrays_kb": _size_kb(*(directory / "arrays" / name for name in arrays.files)),
+        "joblib_load_ms": _timed(
+            lambda: (
+                joblib.load(directory / "classifier.joblib"),
+                joblib.load(directory / "vectorizer.joblib"),
+            )
+        ),
+        "arrays_load_ms": _timed(lambda: ArrayModel(directory / "arrays", mmap=False)),
+        "single_us": single_ms * 1000,
+        "batch_us": batch_ms * 1000,
+    }
+
+
+def compare(hash_bits: int = 18):
+    texts, labels = load_data()
+    if len(texts) < 50:
+        print(f"Only {len(texts)} samples found. Run data/download_data.py first.")
+        return
+
+    train_texts, test_texts, y_train, y_test = train_test_split(
+        texts, labels, test_size=0.2, random_state=42, stratify=labels
+    )
+    candidates = {
+        "vocabulary": build_vectorizer(),
+        f"hashing 2^{hash_bits}": build_vectorizer(hashing=True, hash_bits=hash_bits),
+    }
+
+    print(
+        f"{'vectorizer':>14} {'F1':>7} {'joblib KB':>10} {'arrays KB':>10} "
+        f"{'joblib load':>12} {'arrays load':>12} {'single':>10} {'batch':>10}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, (name, vectorizer) in enumerate(candidates.items()):
+            row = _evaluate(
+                vectorizer, train_texts, y_train, test_texts, y_test, Path(tmp) / str(i)
+            )
+            print(
+                f"{name:>14} {row['f1']:>7.4f} {row['joblib_kb']:>10.0f} {row['arrays_kb']:>10.0f} "
+                f"{row['joblib_load_ms']:>10.1f}ms {row['arrays_load_ms']:>10.1f}ms "
+                f"{row['single_us']:>8.0f}us {row['batch_us']:>8.0f}us"
+            )
+    print(f"\nLatency is per prompt, scored alone and in batches of {BATCH_SIZE}.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--hash-bits", type=int, default=18, help="log2 of the hashed column count (default 18)"
+    )
+    compare(parser.parse_args().hash_bits)
@@ -1,13 +1,14 @@
 """Train the TF-IDF + Logistic Regression classifier.
 
 Usage:
-    python -m ml.train
+    python -m ml.train [--hashing] [--hash-bits N]
 
 Requires: pip install .[ml]
 """
 
 from __future__ import annotations
 
+import argparse
 import json
 from pathlib import Path
 
@@ -18,6 +19,8 @@ from sklearn.linear_model import LogisticRegression
 from sklearn.model_selection import cross_val_score, train_test_split
 from sklearn.metrics import classification_report, confusion_matrix
 
+from detector.engine.array_model import HashingTfidfVectorizer, export_model
+
 DATA_DIR = Path(__file__).parent.parent / "data"
 MODEL_DIR = Path(__file__).parent / "model"
 
@@ -49,7 +52,19 @@ def load_data() -> tuple[list[str], list[int]]:
     return texts, labels
 
 
-def train():
+def build_vectorizer(hashing: bool = False, hash_bits: int = 18):
+    """Char n-gram TF-IDF, with a learned vocabulary or hashed into ``2**hash_bits`` columns."""
+    if hashing:
+        return HashingTfidfVectorizer(ngram_range=(3, 5), bits=hash_bits, sublinear_tf=True)
+    return TfidfVectorizer(
+        analyzer="char_wb",
+        ngram_range=(3, 5),
+        max_features=10000,
+        sublinear_tf=True,
+    )
+
+
+def train(hashing: bool = False, hash_bits: int = 18):
     texts, labels = load_data()
 
     if len(texts) < 50:
@@ -59,13 +74,8 @@ def train():
 
     print(f"Loaded {len(texts)} samples ({sum(labels)} injection, {len(labels) - sum(labels)} benign)")
 
-    # TF-IDF with both character and word n-grams
-    vectorizer = TfidfVectorizer(
-        analyzer="char_wb",
-        ngram_range=(3, 5),
-        max_features=10000,
-        sublinear_tf=True,
-    )
+    # TF-IDF over character n-grams within word boundaries
+    vectorizer = build_vectorizer(hashing, hash_bits)
 
     X = vectorizer.fit_transform(texts)
     y = labels
@@ -100,6 +110,8 @@ def train():
     MODEL_DIR.mkdir(parents=True, exist_ok=True)
     joblib.dump(final_model, MODEL_DIR / "classifier.joblib")
     joblib.dump(vectorizer, MODEL_DIR / "vectorizer.joblib")
+    # Plain arrays the API scores with NumPy alone, without unpickling sklearn objects
+    export_model(vectorizer, final_model, MODEL_DIR / "arrays")
 
     # Save metrics
     report_dict = classification_report(y_test, y_pred, target_names=["benign", "injection"], output_dict=True)
@@ -109,6 +121,7 @@ def train():
         "test_precision_injection": round(report_dict["injection"]["precision"], 4),
         "test_recall_injection": round(report_dict["injection"]["recall"], 4),
         "test_f1_injection": round(report_dict["injection"]["f1-score"], 4),
+        "vectorizer": f"hashing ({1 << hash_bits} columns)" if hashing else "vocabulary",
         "total_samples": len(texts),
         "test_samples": len(y_test),
     }
@@ -117,8 +130,19 @@ def train():
 
     print(f"\nModel saved to {MODEL_DIR / 'classifier.joblib'}")
     print(f"Vectorizer saved to {MODEL_DIR / 'vectorizer.joblib'}")
+    print(f"Exported arrays saved to {MODEL_DIR / 'arrays'}")
     print(f"Metrics saved to {MODEL_DIR / 'metrics.json'}")
 
 
 if __name__ == "__main__":
-    train()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--hashing",
+        action="store_true",
+        help="hash n-grams into a fixed number of columns instead of learning a vocabulary",
+    )
+    parser.add_argument(
+        "--hash-bits", type=int, default=18, help="log2 of the hashed column count (default 18)"
+    )
+    args = parser.parse_args()
+    train(hashing=args.hashing, hash_bits=args.hash_bits)
@@ -1,16 +1,29 @@
 """FastAPI application factory."""
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
+from detector import services
 from detector.router import router
 from detector.config import settings
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load and warm up in the background so the server answers /health and
+    # /ready straight away; /ready turns 200 once everything is warm.
+    startup = services.start()
+    yield
+    await services.stop(startup)
+
+
 def create_app() -> FastAPI:
     app = FastAPI(
         title=settings.app_name,
         description="Multi-layered LLM prompt injection detection API",
         version="0.1.0",
+        lifespan=lifespan,
     )
     app.include_router(router)
     return app
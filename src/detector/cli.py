@@ -0,0 +1,313 @@
+"""Command-line tools.
+
+Usage:
+    detector scan INPUT [-o OUTPUT] [--format jsonl|parquet] [--field NAME] [--id-field NAME]
+                  [--workers N] [--chunk-size N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import codecs
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator
+
+OUTPUT_FORMATS = ("jsonl", "parquet")
+# Columns of every scan result, in output order
+RESULT_COLUMNS = (
+    "id",
+    "verdict",
+    "confidence",
+    "primary_category",
+    "triggered_detectors",
+    "prompt_hash",
+    "model_version",
+)
+
+# Each pool process builds its own ensemble once, in the pool initializer.
+_worker_ensemble = None
+
+
+def _init_worker() -> None:
+    global _worker_ensemble
+    from detector.engine.ensemble import EnsembleDetector
+
+    _worker_ensemble = EnsembleDetector()
+
+
+def _scan_chunk(prompts: list[str]) -> list[dict]:
+    """Verdict columns (all but ``id``) for each prompt of one chunk."""
+    global _worker_ensemble
+    if _worker_ensemble is None:
+        _init_worker()
+    return [
+        {
+            "verdict": result.verdict.value,
+            "confidence": result.confidence,
+            "primary_category": result.primary_category.value,
+            "triggered_detectors": [
+                d.detector_name for d in result.triggered_detectors if d.triggered
+            ],
+            "prompt_hash": result.prompt_hash,
+            "model_version": result.model_version,
+        }
+        for result in _worker_ensemble.analyze_batch(prompts)
+    ]
+
+
+class _ByteCounter:
+    """Iterates a binary file's lines, counting the bytes read."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.bytes = 0
+
+    def __iter__(self) -> Iterator[bytes]:
+        for line in self.stream:
+            self.bytes += len(line)
+            yield line
+
+
+def _records(lines: _ByteCounter, input_format: str) -> Iterator[dict | None]:
+    """Each record of the input, or None for a line that isn't a valid record."""
+    if input_format == "csv":
+        yield from csv.DictReader(codecs.iterdecode(lines, "utf-8"))
+        return
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield None
+            continue
+        yield record if isinstance(record, dict) else None
+
+
+def _chunks(
+    records: Iterable[dict | None], field: str, id_field: str | None, size: int, skipped: Counter
+) -> Iterator[tuple[list, list[str]]]:
+    """(ids, prompts) in chunks of ``size``, skipping records without a usable prompt."""
+    ids: list = []
+    prompts: list[str] = []
+    for row, record in enumerate(records):
+        prompt = record.get(field) if record is not None else None
+        if not isinstance(prompt, str) or not prompt:
+            skipped["skipped"] += 1
+            continue
+        ids.append(record.get(id_field) if id_field else row)
+        prompts.append(prompt)
+        if len(prompts) == size:
+            yield ids, prompts
+            ids, prompts = [], []
+    if prompts:
+        yield ids, prompts
+
+
+class _JSONLWriter:
+    def __init__(self, path: str):
+        self._file = sys.stdout if path == "-" else open(path, "w", encoding="utf-8")
+
+    def write(self, rows: list[dict]) -> None:
+        self._file.write("".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows))
+
+    def close(self) -> None:
+        if self._file is not sys.stdout:
+            self._file.close()
+
+
+class _ParquetWriter:
+    """Writes each chunk as a Parquet row group, so memory stays bounded by the chunk size."""
+
+    def __init__(self, path: str):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Parquet output requires pyarrow: pip install .[scan]")
+        self._pa = pa
+        self._schema = pa.schema([
+            ("id", pa.string()),
+            ("verdict", pa.string()),
+            ("confidence", pa.float64()),
+            ("primary_category", pa.string()),
+            ("triggered_detectors", pa.list_(pa.string())),
+            ("prompt_hash", pa.string()),
+            ("model_version", pa.string()),
+        ])
+        self._writer = pq.ParquetWriter(path, self._schema)
+
+    def write(self, rows: list[dict]) -> None:
+        columns = {name: [row[name] for row in rows] for name in RESULT_COLUMNS}
+        columns["id"] = [None if value is None else str(value) for value in columns["id"]]
+        self._writer.write_table(self._pa.Table.from_pydict(columns, schema=self._schema))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+def scan(
+    input_path: str,
+    output_path: str = "-",
+    output_format: str = "jsonl",
+    field: str = "text",
+    id_field: str | None = None,
+    workers: int | None = None,
+    chunk_size: int = 256,
+) -> dict:
+    """Score every prompt in a JSONL or CSV file and write one result row per prompt.
+
+    The input is read and the output written chunk by chunk, with at most
+    two chunks per worker in flight, so memory use does not grow with the
+    input. Results keep input order. Rows are identified by ``id_field``
+    when given, else by their record number. Returns the run's summary.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"output format must be one of {OUTPUT_FORMATS}, got {output_format!r}")
+    if output_format == "parquet" and output_path == "-":
+        raise ValueError("parquet output needs a file path")
+    if workers is not None and workers < 1:
+        raise ValueError(f"workers must be a positive integer, got {workers}")
+    if chunk_size < 1:
+        raise ValueError(f"chunk size must be a positive integer, got {chunk_size}")
+    workers = workers or os.cpu_count() or 1
+    input_format = "csv" if Path(input_path).suffix.lower() == ".csv" else "jsonl"
+
+    summary: Counter = Counter()
+    started = time.perf_counter()
+    # Opened before the writer, so a missing input leaves no empty result file behind
+    with open(input_path, "rb") as stream:
+        writer = (
+            _ParquetWriter(output_path) if output_format == "parquet" else _JSONLWriter(output_path)
+        )
+        pool = None
+        try:
+            lines = _ByteCounter(stream)
+            chunks = _chunks(_records(lines, input_format), field, id_field, chunk_size, summary)
+
+            def write(ids: list, results: list[dict]) -> None:
+                writer.write([{"id": id_, **result} for id_, result in zip(ids, results)])
+                summary["prompts"] += len(results)
+                summary.update(result["verdict"] for result in results)
+
+            if workers == 1:
+                for ids, prompts in chunks:
+                    write(ids, _scan_chunk(prompts))
+            else:
+                # Spawned, not forked, like the API's process executor
+                pool = ProcessPoolExecutor(
+                    workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+                pending: deque = deque()
+                for ids, prompts in chunks:
+                    pending.append((ids, pool.submit(_scan_chunk, prompts)))
+                    if len(pending) >= workers * 2:
+                        ids, future = pending.popleft()
+                        write(ids, future.result())
+                while pending:
+                    ids, future = pending.popleft()
+                    write(ids, future.result())
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+            writer.close()
+
+    elapsed = time.perf_counter() - started
+    return {
+        **summary,
+        # A Counter omits keys never counted; an empty or all-skipped input still has these
+        "prompts": summary["prompts"],
+        "skipped": summary["skipped"],
+        "megabytes": lines.bytes / 1_000_000,
+        "seconds": elapsed,
+        "prompts_per_sec": summary["prompts"] / elapsed if elapsed else 0.0,
+        "mb_per_sec": lines.bytes / 1_000_000 / elapsed if elapsed else 0.0,
+    }
+
+
+def _positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value!r}")
+    return number
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="detector", description="Prompt injection detector tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    scan_parser = commands.add_parser(
+        "scan", help="score every prompt in a JSONL or CSV file (streamed, across all cores)"
+    )
+    scan_parser.add_argument("input", help="JSONL file, or CSV when the name ends in .csv")
+    scan_parser.add_argument(
+        "-o", "--output", default="-", help="where to write results (default: stdout)"
+    )
+    scan_parser.add_argument("--format", choices=OUTPUT_FORMATS, default="jsonl")
+    scan_parser.add_argument(
+        "--field", default="text", help="field holding the prompt (default: text)"
+    )
+    scan_parser.add_argument(
+        "--id-field", help="field copied to each result's id (default: the record number)"
+    )
+    scan_parser.add_argument(
+        "--workers",
+        type=_positive_int,
+        help="scanning processes (default: one per core; 1 scans inline)",
+    )
+    scan_parser.add_argument(
+        "--chunk-size",
+        type=_positive_int,
+        default=256,
+        help="prompts per batch (default: 256)",
+    )
+
+    args = parser.parse_args(argv)
+    try:
+        summary = scan(
+            args.input,
+            args.output,
+            args.format,
+            field=args.field,
+            id_field=args.id_field,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+        )
+    except (OSError, ValueError) as exc:
+        parser.exit(2, f"detector scan: {exc}\n")
+
+    verdicts = ", ".join(
+        f"{summary.get(verdict, 0)} {verdict.lower()}"
+        for verdict in ("CLEAN", "SUSPICIOUS", "MALICIOUS")
+    )
+    print(
+        f"Scanned {summary['prompts']} prompts ({summary['megabytes']:.1f} MB) in "
+        f"{summary['seconds']:.1f}s: {summary['prompts_per_sec']:.0f} prompts/sec, "
+        f"{summary['mb_per_sec']:.2f} MB/sec. {verdicts}; "
+        f"{summary['skipped']} records skipped.",
+        file=sys.stderr,
+    )
+    if summary["skipped"] and not summary["prompts"]:
+        parser.exit(
+            1,
+            f"detector scan: no record had a non-empty {args.field!r} field"
+            " (choose the prompt field with --field)\n",
+        )
+
+
+if __name__ == "__main__":
+    main()
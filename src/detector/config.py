@@ -23,12 +23,61 @@ class Settings(BaseSettings):
     heuristic_weight: float = 0.25
     ml_weight: float = 0.40
 
+    # Regex time budget per prompt (0 disables). Patterns that can backtrack
+    # polynomially are searched last, in overlapping slices of N characters.
+    regex_time_budget_ms: float = 50.0
+    regex_guarded_max_chars: int = 2048
+
+    # Prompts longer than long_input_chars are scored in overlapping windows (0 disables),
+    # scoring at most long_input_budget_chars characters in total (0 for no limit)
+    long_input_chars: int = 32768
+    long_input_window_chars: int = 8192
+    long_input_overlap_chars: int = 1024
+    long_input_budget_chars: int = 2_000_000
+
+    # Cascade mode: run detectors cheapest first and stop once the verdict can't change
+    cascade_mode: bool = False
+
     # ML model paths
     model_path: str = str(_PROJECT_ROOT / "ml" / "model" / "classifier.joblib")
     vectorizer_path: str = str(_PROJECT_ROOT / "ml" / "model" / "vectorizer.joblib")
+    # Exported arrays (ml/train.py writes them); preferred over the joblib files when present
+    model_arrays_path: str = str(_PROJECT_ROOT / "ml" / "model" / "arrays")
+    # Map the exported arrays read-only so every worker process shares one copy
+    model_mmap: bool = True
+    # Reload the model when its artifacts change, polling every N seconds (0 disables)
+    model_watch_interval_seconds: float = 0.0
+    # Share of the built-in canary prompts a reloaded model must classify correctly
+    model_canary_min_accuracy: float = 0.8
+
+    # Where ensemble analysis runs: "thread" or "process" pool, or "inline" on the event loop
+    executor: str = "thread"
+    executor_workers: int = 4
+
+    # Verdict cache (0 disables)
+    cache_size: int = 10000
+    cache_ttl_seconds: float = 300.0
+
+    # Batch analysis
+    max_batch_size: int = 256
 
     # Storage
     db_path: str = str(_PROJECT_ROOT / "detector_results.db")
+    db_synchronous: str = "NORMAL"
+    db_cache_size_kb: int = 16384
+
+    # Write-behind batching of analysis rows (disable to write synchronously)
+    store_write_behind: bool = True
+    store_flush_rows: int = 100
+    store_flush_interval_ms: float = 50.0
+    store_queue_size: int = 10000
+
+    # Structured logs: buffered and written in batches by a background thread, or inline.
+    # When the buffer is full the newest (or with "oldest", the oldest) record is dropped.
+    log_async: bool = True
+    log_queue_size: int = 10000
+    log_batch_size: int = 256
+    log_drop_policy: str = "newest"
 
     model_config = {"env_prefix": "DETECTOR_"}
 
@@ -0,0 +1,423 @@
+"""TF-IDF + logistic regression inference from exported NumPy arrays.
+
+``export_model`` writes a fitted ``TfidfVectorizer(analyzer="char_wb")`` and
+binary ``LogisticRegression`` as plain arrays plus a small JSON header, and
+``ArrayModel`` scores prompts from those files with NumPy alone, so serving
+needs neither sklearn nor scipy nor unpickling.
+
+The vocabulary is stored as an open-addressing hash table rather than a
+dict, so every array can be memory-mapped read-only: worker processes that
+map the same export share its physical pages instead of each holding a copy.
+A model trained with ``HashingTfidfVectorizer`` has no vocabulary at all.
+
+``export_model`` never rewrites a file in place: each export goes into a
+fresh version directory, and the ``CURRENT`` file naming it is replaced
+last with an atomic rename. Processes still mapping an older export keep
+reading its files, and a reader sees either the old export or the new one.
+
+Layout of an export directory::
+
+    CURRENT         name of the version directory holding the current export
+    <version>/
+      meta.json     format version, n-gram range, tf/normalisation options, intercept
+      terms.npy     vocabulary n-grams in feature-column order (fixed-width unicode)
+      lengths.npy   length of each term (uint8)
+      hashes.npy    hash of each term (uint64, see ``_hash_spans``)
+      table.npy     hash table of feature columns, -1 for empty slots (int32)
+                    (terms, lengths, hashes and table are absent for hashed models)
+      idf.npy       inverse document frequency per column (float64)
+      coef.npy      logistic regression coefficient per column (float64)
+
+A directory holding ``meta.json`` and the arrays directly, as written by
+earlier versions, still loads.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+FORMAT_VERSION = 2
+CURRENT_FILE = "CURRENT"
+ARRAY_FILES = (
+    "meta.json",
+    "terms.npy",
+    "lengths.npy",
+    "hashes.npy",
+    "table.npy",
+    "idf.npy",
+    "coef.npy",
+)
+
+_HASH_PRIME = 0x100000001B3
+_SLOT_MULTIPLIER = 0x9E3779B97F4A7C15
+
+
+def _hash_spans(np, codepoints, starts, lengths, max_length: int):
+    """Polynomial hash of ``codepoints[start:start + length]`` for every span.
+
+    ``codepoints`` must extend at least ``max_length`` past the last start.
+    """
+    hashes = lengths.astype(np.uint64)
+    for offset in range(max_length):
+        hashes = np.where(
+            offset < lengths,
+            hashes * np.uint64(_HASH_PRIME) + codepoints[starts + offset],
+            hashes,
+        )
+    return hashes
+
+
+def _slots(np, hashes, bits: int):
+    return ((hashes * np.uint64(_SLOT_MULTIPLIER)) >> np.uint64(64 - bits)).astype(np.intp)
+
+
+def _char_wb_spans(np, texts: list[str], min_n: int, max_n: int):
+    """Every char_wb n-gram of the batch, hashed.
+
+    Same n-grams as sklearn's ``char_wb`` analyzer, minus its lowercasing:
+    each whitespace-separated word is padded with one space either side and
+    yields every n-gram that fits inside it; a padded word shorter than the
+    smallest n yields itself once. Returns the buffer of all padded words,
+    its codepoints, and the (row, start, length, hash) of every n-gram.
+    """
+    words: list[str] = []
+    words_per_text: list[int] = []
+    for text in texts:
+        split = text.split()
+        words.extend(split)
+        words_per_text.append(len(split))
+
+    buffer = " " + "  ".join(words) + " " if words else ""
+    # Zero padding lets every position read max_n codepoints without bounds checks
+    codepoints = np.zeros(len(buffer) + max_n, dtype=np.uint64)
+    codepoints[:len(buffer)] = np.frombuffer(
+        buffer.encode("utf-32-le", "surrogatepass"), dtype=np.uint32
+    )
+    word_lengths = np.fromiter(map(len, words), dtype=np.intp, count=len(words)) + 2
+    word_ends = np.repeat(np.cumsum(word_lengths), word_lengths)
+    word_rows = np.repeat(np.repeat(np.arange(len(texts)), words_per_text), word_lengths)
+    positions = np.arange(len(buffer))
+    has_short_words = bool((word_lengths < min_n).any())
+
+    rows, starts, lengths, hashes = [], [], [], []
+    prefix = np.zeros(len(buffer), dtype=np.uint64)
+    for length in range(1, max_n + 1):
+        # prefix[i] is now the polynomial of codepoints[i:i + length]
+        prefix = prefix * np.uint64(_HASH_PRIME) + codepoints[length - 1:length - 1 + len(buffer)]
+        if length >= min_n:
+            fits = positions + length <= word_ends
+        elif has_short_words:
+            # Only the start of a word exactly this long
+            fits = (word_ends - positions == length) & (
+                word_ends - word_lengths.repeat(word_lengths) == positions
+            )
+        else:
+            continue
+        span_starts = np.flatnonzero(fits)
+        rows.append(word_rows[span_starts])
+        starts.append(span_starts)
+        lengths.append(np.full(span_starts.size, length))
+        hashes.append(prefix[span_starts] + np.uint64(length * _HASH_PRIME**length % 2**64))
+    return (
+        buffer,
+        codepoints,
+        np.concatenate(rows),
+        np.concatenate(starts),
+        np.concatenate(lengths),
+        np.concatenate(hashes),
+    )
+
+
+def _hashed_counts(np, texts: list[str], min_n: int, max_n: int, bits: int):
+    """(row, column, count) of every hashed char_wb n-gram in the batch."""
+    _, _, rows, _, _, hashes = _char_wb_spans(np, texts, min_n, max_n)
+    keys, counts = np.unique(rows * (1 << bits) + _slots(np, hashes, bits), return_counts=True)
+    rows, columns = np.divmod(keys, 1 << bits)
+    return rows, columns, counts
+
+
+class HashingTfidfVectorizer:
+    """``TfidfVectorizer(analyzer="char_wb")`` with feature hashing instead of a vocabulary.
+
+    Each n-gram's column is its hash (the same one ``ArrayModel`` computes)
+    folded into ``2 ** bits`` columns, so only the idf array is learned and
+    scoring needs no vocabulary lookup. Colliding n-grams share a column.
+    Fitting and transforming need sklearn and scipy.
+    """
+
+    analyzer = "char_wb"
+
+    def __init__(
+        self,
+        ngram_range: tuple[int, int] = (3, 5),
+        bits: int = 18,
+        lowercase: bool = True,
+        sublinear_tf: bool = False,
+        norm: str | None = "l2",
+    ):
+        self.ngram_range = ngram_range
+        self.bits = bits
+        self.lowercase = lowercase
+        self.sublinear_tf = sublinear_tf
+        self.norm = norm
+
+    def fit(self, texts: list[str], y=None) -> HashingTfidfVectorizer:
+        self.fit_transform(texts)
+        return self
+
+    def fit_transform(self, texts: list[str], y=None):
+        from sklearn.feature_extraction.text import TfidfTransformer
+
+        self._tfidf = TfidfTransformer(norm=self.norm, sublinear_tf=self.sublinear_tf)
+        features = self._tfidf.fit_transform(self._counts(texts))
+        self.idf_ = self._tfidf.idf_
+        return features
+
+    def transform(self, texts: list[str]):
+        return self._tfidf.transform(self._counts(texts))
+
+    def _counts(self, texts: list[str]):
+        import numpy as np
+        from scipy.sparse import csr_matrix
+
+        if self.lowercase:
+            texts = [text.lower() for text in texts]
+        rows, columns, counts = _hashed_counts(np, texts, *self.ngram_range, self.bits)
+        return csr_matrix(
+            (counts.astype(np.float64), (rows, columns)), shape=(len(texts), 1 << self.bits)
+        )
+
+
+def export_model(vectorizer, model, directory: str | Path) -> None:
+    """Write ``vectorizer`` and ``model`` to ``directory`` in the array format.
+
+    ``vectorizer`` is a fitted ``TfidfVectorizer`` or ``HashingTfidfVectorizer``;
+    a hashing one exports no vocabulary files.
+    """
+    import numpy as np
+
+    if isinstance(vectorizer, HashingTfidfVectorizer):
+        _check_model(vectorizer, model)
+        _save_arrays(vectorizer, model, directory, {"hash_bits": vectorizer.bits}, {})
+        return
+
+    if vectorizer.analyzer != "char_wb":
+        raise ValueError(f"only analyzer='char_wb' can be exported, got {vectorizer.analyzer!r}")
+    if vectorizer.strip_accents or vectorizer.preprocessor or vectorizer.binary:
+        raise ValueError("strip_accents, preprocessor and binary are not supported")
+    _check_model(vectorizer, model)
+
+    vocabulary = vectorizer.vocabulary_
+    terms = sorted(vocabulary, key=vocabulary.get)
+    idf = vectorizer.idf_ if vectorizer.use_idf else np.ones(len(terms))
+    max_n = vectorizer.ngram_range[1]
+
+    term_array = np.array(terms, dtype=f"<U{max_n}")
+    lengths = np.array([len(term) for term in terms], dtype=np.uint8)
+    codepoints = term_array.view(np.uint32).astype(np.uint64).ravel()
+    hashes = _hash_spans(np, codepoints, np.arange(len(terms)) * max_n, lengths, max_n)
+
+    # Linear probing at a load factor of at most an eighth, which keeps misses
+    # (most n-grams of a prompt) to a probe or two
+    bits = max(int(np.ceil(np.log2(max(len(terms), 1) * 8))), 1)
+    table = np.full(1 << bits, -1, dtype=np.int32)
+    for column, slot in enumerate(_slots(np, hashes, bits).tolist()):
+        while table[slot] >= 0:
+            slot = (slot + 1) & ((1 << bits) - 1)
+        table[slot] = column
+
+    arrays = {
+        "terms.npy": term_array,
+        "lengths.npy": lengths,
+        "hashes.npy": hashes,
+        "table.npy": table,
+    }
+    _save_arrays(vectorizer, model, directory, {"table_bits": bits}, arrays, idf)
+
+
+def _check_model(vectorizer, model) -> None:
+    if vectorizer.norm not in ("l1", "l2", None):
+        raise ValueError(f"unsupported norm {vectorizer.norm!r}")
+    if len(getattr(model, "classes_", ())) != 2:
+        raise ValueError("only binary classifiers can be exported")
+
+
+def _save_arrays(vectorizer, model, directory, extra_meta: dict, arrays: dict, idf=None) -> None:
+    import numpy as np
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    previous = resolve_export(directory)
+    version = Path(tempfile.mkdtemp(prefix="v-", dir=directory))
+    idf = vectorizer.idf_ if idf is None else idf
+    arrays = {
+        **arrays,
+        "idf.npy": np.asarray(idf, dtype=np.float64),
+        "coef.npy": np.asarray(model.coef_, dtype=np.float64).ravel(),
+    }
+    for name in ARRAY_FILES[1:]:
+        if name in arrays:
+            np.save(version / name, arrays[name])
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "ngram_range": list(vectorizer.ngram_range),
+        "lowercase": bool(vectorizer.lowercase),
+        "sublinear_tf": bool(vectorizer.sublinear_tf),
+        "norm": vectorizer.norm,
+        "intercept": float(model.intercept_[0]),
+        **extra_meta,
+    }
+    (version / "meta.json").write_text(json.dumps(meta, indent=2))
+    version.chmod(0o755)
+
+    pointer = directory / f".{CURRENT_FILE}.{os.getpid()}"
+    pointer.write_text(version.name + "\n")
+    os.replace(pointer, directory / CURRENT_FILE)
+
+    # Older exports are no longer reachable. Removing them leaves processes
+    # that still map their files unaffected; the one just replaced is kept
+    # for a loader that read CURRENT before the swap.
+    for child in directory.glob("v-*"):
+        if child.is_dir() and child not in (version, previous):
+            shutil.rmtree(child, ignore_errors=True)
+
+
+def resolve_export(directory: str | Path) -> Path | None:
+    """The directory holding the current export in ``directory``, or None if there is none."""
+    directory = Path(directory)
+    try:
+        version = (directory / CURRENT_FILE).read_text().strip()
+    except OSError:
+        return directory if (directory / "meta.json").exists() else None
+    return directory / version
+
+
+class ArrayModel:
+    """Scores prompts with an exported model, matching sklearn's ``predict_proba``.
+
+    With ``mmap=True`` the arrays are mapped read-only from disk rather than
+    read into this process's memory.
+    """
+
+    def __init__(self, directory: str | Path, mmap: bool = True):
+        import numpy as np
+
+        self._np = np
+        directory = resolve_export(directory) or Path(directory)
+        self.directory = directory
+        meta = json.loads((directory / "meta.json").read_text())
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"unsupported model format {meta.get('format_version')!r}")
+
+        self.min_n, self.max_n = meta["ngram_range"]
+        self.lowercase = meta["lowercase"]
+        self.sublinear_tf = meta["sublinear_tf"]
+        self.norm = meta["norm"]
+        self.intercept = meta["intercept"]
+        # Hashed models map each n-gram's hash straight to a column
+        self.hash_bits = meta.get("hash_bits")
+        self.files = [name for name in ARRAY_FILES if (directory / name).exists()]
+
+        def load(name):
+            array = np.load(directory / name, mmap_mode="r" if mmap else None)
+            # A plain ndarray view of the mapping: np.memmap indexing is much slower
+            return array.view(np.ndarray)
+
+        self.idf = load("idf.npy")
+        self.coef = load("coef.npy")
+        if self.hash_bits is None:
+            terms = load("terms.npy")
+            self._term_codepoints = terms.view(np.uint32).reshape(len(terms), self.max_n)
+            self._term_lengths = load("lengths.npy")
+            self._term_hashes = load("hashes.npy")
+            self._table = load("table.npy")
+            self._bits = meta["table_bits"]
+
+    def ngrams(self, text: str) -> list[str]:
+        """The n-grams scored for ``text`` (already lowercased), in no particular order."""
+        buffer, _, _, starts, lengths, _ = _char_wb_spans(
+            self._np, [text], self.min_n, self.max_n
+        )
+        return [buffer[s:s + n] for s, n in zip(starts.tolist(), lengths.tolist())]
+
+    def _columns(self, codepoints, starts, lengths, hashes):
+        """Feature column of each n-gram, or -1 when it is not in the vocabulary."""
+        np = self._np
+        columns = np.full(len(starts), -1, dtype=np.intp)
+        mask = (1 << self._bits) - 1
+        offsets = np.arange(self.max_n)
+
+        pending = np.arange(len(starts))
+        slots = _slots(np, hashes, self._bits)
+        while pending.size:
+            candidates = self._table[slots].astype(np.intp)
+            empty = candidates < 0
+            found = np.zeros(pending.size, dtype=bool)
+            maybe = np.flatnonzero(~empty)
+            spans = pending[maybe]
+            same = (self._term_hashes[candidates[maybe]] == hashes[spans]) & (
+                self._term_lengths[candidates[maybe]] == lengths[spans]
+            )
+            maybe, spans = maybe[same], spans[same]
+            if maybe.size:
+                # Compare the characters too, so a hash collision can never match
+                grams = codepoints[starts[spans, None] + offsets]
+                grams[offsets >= lengths[spans, None]] = 0
+                exact = (grams == self._term_codepoints[candidates[maybe]]).all(axis=1)
+                found[maybe[exact]] = True
+                columns[spans[exact]] = candidates[maybe[exact]]
+            unresolved = ~(empty | found)
+            pending = pending[unresolved]
+            slots = (slots[unresolved] + 1) & mask
+        return columns
+
+    def decision_function(self, texts: list[str], preprocessed: bool = False):
+        """Logistic regression margin per text.
+
+        Pass ``preprocessed=True`` when the texts are already lowercased as the
+        vectorizer would have done.
+        """
+        np = self._np
+        if self.lowercase and not preprocessed:
+            texts = [text.lower() for text in texts]
+
+        if self.hash_bits is not None:
+            rows, cols, counts = _hashed_counts(np, texts, self.min_n, self.max_n, self.hash_bits)
+        else:
+            _, codepoints, rows, starts, lengths, hashes = _char_wb_spans(
+                np, texts, self.min_n, self.max_n
+            )
+            columns = self._columns(codepoints, starts, lengths, hashes)
+            known = columns >= 0
+
+            # Count each (text, column) pair once for the whole batch
+            vocabulary_size = len(self.idf)
+            keys, counts = np.unique(
+                rows[known] * vocabulary_size + columns[known], return_counts=True
+            )
+            rows, cols = np.divmod(keys, vocabulary_size)
+
+        tf = counts.astype(np.float64)
+        if self.sublinear_tf:
+            tf = np.log(tf) + 1
+        weights = tf * self.idf[cols]
+
+        dot = np.bincount(rows, weights=weights * self.coef[cols], minlength=len(texts))
+        if self.norm is not None:
+            magnitudes = weights * weights if self.norm == "l2" else np.abs(weights)
+            norms = np.bincount(rows, weights=magnitudes, minlength=len(texts))
+            if self.norm == "l2":
+                norms = np.sqrt(norms)
+            # Rows without any known n-gram stay all-zero, as sklearn's normalize leaves them.
+            # (bincount over no n-grams at all returns integers, hence the float output.)
+            dot = np.divide(dot, norms, out=np.zeros(len(texts)), where=norms > 0)
+        return dot + self.intercept
+
+    def predict_proba(self, texts: list[str], preprocessed: bool = False):
+        """Probability of the positive (injection) class per text."""
+        np = self._np
+        return 1.0 / (1.0 + np.exp(-self.decision_function(texts, preprocessed)))
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 
+from detector.engine.prepared import PreparedPrompt
 from detector.models import DetectorResult
 
 
@@ -13,6 +14,15 @@ class BaseDetector(ABC):
     name: str = ""
 
     @abstractmethod
-    def detect(self, prompt: str) -> DetectorResult:
-        """Analyze a prompt and return a detection result."""
+    def detect(self, prompt: str | PreparedPrompt) -> DetectorResult:
+        """Analyze a prompt and return a detection result.
+
+        The ensemble passes a ``PreparedPrompt`` so detectors can share its
+        lowercased text, tokens and character counts; plain strings are
+        accepted too (see ``prepare``).
+        """
         ...
+
+    def detect_batch(self, prompts: list[str | PreparedPrompt]) -> list[DetectorResult]:
+        """Analyze several prompts. Override when a detector can share work across them."""
+        return [self.detect(prompt) for prompt in prompts]
@@ -0,0 +1,174 @@
+"""Runs ensemble analysis off the event loop in a thread or process pool."""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from detector import metrics
+from detector.engine.ensemble import WARM_UP_PROMPTS, EnsembleDetector
+from detector.models import AnalysisResponse, DetectorResult
+
+EXECUTOR_MODES = ("inline", "thread", "process")
+
+# Each pool process builds its own ensemble once, in the pool initializer.
+_worker_ensemble: EnsembleDetector | None = None
+
+
+def _init_worker() -> None:
+    global _worker_ensemble
+    _worker_ensemble = EnsembleDetector()
+
+
+def _worker_call(method: str, arg):
+    """Run ``method`` and hand back the detector timings it recorded in this process."""
+    result = getattr(_worker_ensemble, method)(arg)
+    return result, metrics.DETECTOR_LATENCY.drain()
+
+
+def _timed(fn, *args) -> tuple[float, object]:
+    """Run ``fn`` and return (monotonic start time, result) so callers can measure queueing."""
+    started = time.monotonic()
+    return started, fn(*args)
+
+
+class DetectorExecutor:
+    """Dispatches CPU-bound ensemble calls according to ``mode``.
+
+    - ``inline`` runs on the calling (event loop) thread, as before.
+    - ``thread`` runs in a thread pool sharing this process's ensemble.
+    - ``process`` runs in a pool of worker processes, each with its own
+      ensemble, so analysis is not limited by the GIL.
+
+    Queue depth is the number of submitted calls waiting for a free worker;
+    wait time is how long each call waited before starting.
+    """
+
+    def __init__(self, ensemble: EnsembleDetector, mode: str = "thread", max_workers: int = 4):
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"executor mode must be one of {EXECUTOR_MODES}, got {mode!r}")
+        self.ensemble = ensemble
+        self.mode = mode
+        self.max_workers = max_workers
+        self.completed = 0
+        self.in_flight = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+        self._lock = threading.Lock()
+        self._pool: Executor | None = None
+        if mode == "thread":
+            self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix="detector")
+        elif mode == "process":
+            self._pool = self._process_pool()
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        # Spawned, not forked: the API process already runs background threads.
+        return ProcessPoolExecutor(
+            self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+
+    async def analyze(self, prompt: str) -> AnalysisResponse:
+        if self.mode == "process" and self.ensemble.is_long(prompt):
+            # Split the windows of one long prompt across every worker process;
+            # this process only windows the prompt and combines their results
+            return await asyncio.to_thread(self.ensemble.analyze, prompt, self._score_windows)
+        return await self._run("analyze", prompt)
+
+    async def analyze_batch(self, prompts: list[str]) -> list[AnalysisResponse]:
+        return await self._run("analyze_batch", prompts)
+
+    async def _run(self, method: str, arg):
+        if self._pool is None:
+            return getattr(self.ensemble, method)(arg)
+
+        if self.mode == "process":
+            call = (_timed, _worker_call, method, arg)
+        else:
+            call = (_timed, getattr(self.ensemble, method), arg)
+
+        submitted = time.monotonic()
+        with self._lock:
+            self.in_flight += 1
+        try:
+            started, result = await asyncio.get_running_loop().run_in_executor(self._pool, *call)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+        if self.mode == "process":
+            result, detector_latency = result
+            metrics.DETECTOR_LATENCY.merge(detector_latency)
+
+        wait_ms = max(started - submitted, 0.0) * 1000
+        with self._lock:
+            self.completed += 1
+            self.wait_ms_total += wait_ms
+            self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+        return result
+
+    def _score_windows(self, texts: list[str]) -> list[list[DetectorResult]]:
+        """``EnsembleDetector.score_windows`` over the pool, one slice of windows per worker."""
+        size = -(-len(texts) // self.max_workers)
+        futures = [
+            self._pool.submit(_worker_call, "score_windows", texts[i:i + size])
+            for i in range(0, len(texts), size)
+        ]
+        results = []
+        for future in futures:
+            chunk, detector_latency = future.result()
+            metrics.DETECTOR_LATENCY.merge(detector_latency)
+            results.extend(chunk)
+        return results
+
+    @property
+    def queue_depth(self) -> int:
+        if self._pool is None:
+            return 0
+        return max(self.in_flight - self.max_workers, 0)
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "workers": self.max_workers if self._pool is not None else 0,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "wait_ms_avg": round(self.wait_ms_total / self.completed, 3) if self.completed else 0.0,
+            "wait_ms_max": round(self.wait_ms_max, 3),
+        }
+
+    def warm_up(self) -> None:
+        """Warm the ensemble each worker scores with, blocking until done.
+
+        In process mode this submits one warm-up per worker, which also starts
+        the pool processes and has each load its model before the first request.
+        """
+        if self.mode != "process":
+            self.ensemble.warm_up()
+            return
+        futures = [
+            self._pool.submit(_worker_call, "warm_up", WARM_UP_PROMPTS)
+            for _ in range(self.max_workers)
+        ]
+        for future in futures:
+            future.result()
+
+    def recycle(self) -> None:
+        """Start fresh pool processes, so they load the model currently on disk.
+
+        Only process mode keeps ensembles outside this process. Calls already
+        submitted finish on the old processes, which then exit.
+        """
+        if self.mode != "process":
+            return
+        old, self._pool = self._pool, self._process_pool()
+        old.shutdown(wait=False)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
@@ -11,9 +11,10 @@ from __future__ import annotations
 
 import math
 import re
-from collections import Counter
+from typing import Callable
 
 from detector.engine.base import BaseDetector
+from detector.engine.prepared import PreparedPrompt, prepare
 from detector.models import DetectorResult, AttackCategory
 
 INSTRUCTION_TOKENS = {
@@ -33,40 +34,140 @@ ROLE_MARKERS = re.compile(
 )
 
 SPECIAL_CHARS = set('{}[]<>\\|`~^')
+_SPECIAL_CODEPOINTS = sorted(ord(c) for c in SPECIAL_CHARS)
 
+# Below this many characters in total, NumPy's fixed per-call overhead costs
+# more than it saves and the batch is scored one prompt at a time
+BATCH_MIN_CHARS = 2048
 
-def _char_entropy(text: str) -> float:
+
+def _char_entropy(text: str | PreparedPrompt) -> float:
     """Calculate Shannon entropy of character distribution."""
-    if not text:
+    prompt = prepare(text)
+    if not prompt.text:
         return 0.0
-    counts = Counter(text.lower())
-    total = len(text)
-    return -sum((c / total) * math.log2(c / total) for c in counts.values() if c > 0)
+    counts = prompt.char_counts
+    total = len(prompt.text)
+    return -math.fsum((c / total) * math.log2(c / total) for c in counts.values() if c > 0)
 
 
-def _instruction_token_ratio(text: str) -> float:
+def _instruction_token_ratio(text: str | PreparedPrompt) -> float:
     """Ratio of instruction-like tokens to total tokens."""
-    words = re.findall(r'\w+', text.lower())
+    words = prepare(text).words
     if not words:
         return 0.0
-    instruction_count = sum(1 for w in words if w in INSTRUCTION_TOKENS)
+    instruction_count = sum(map(INSTRUCTION_TOKENS.__contains__, words))
     return instruction_count / len(words)
 
 
-def _structural_marker_density(text: str) -> float:
+def _structural_marker_density(text: str | PreparedPrompt) -> float:
     """Count of role/delimiter markers normalized by text length."""
-    matches = ROLE_MARKERS.findall(text)
+    text = prepare(text).text
     if not text:
         return 0.0
+    matches = ROLE_MARKERS.findall(text)
     return len(matches) / max(len(text) / 100, 1)
 
 
-def _special_char_density(text: str) -> float:
+def _special_char_density(text: str | PreparedPrompt) -> float:
     """Ratio of special characters that are common in injection payloads."""
-    if not text:
+    prompt = prepare(text)
+    if not prompt.text:
         return 0.0
-    special_count = sum(1 for c in text if c in SPECIAL_CHARS)
-    return special_count / len(text)
+    # Lowercasing leaves these characters alone, so the shared counts can be used
+    counts = prompt.char_counts
+    special_count = sum(counts.get(c, 0) for c in SPECIAL_CHARS)
+    return special_count / len(prompt.text)
+
+
+# Every feature reads the prompt's shared views, so together they cost one
+# character count, one tokenization and one marker scan however many there
+# are. Register a new feature here and read it in ``detect``.
+FEATURES: dict[str, Callable[[PreparedPrompt], float]] = {
+    "entropy": _char_entropy,
+    "token_ratio": _instruction_token_ratio,
+    "structural": _structural_marker_density,
+    "special": _special_char_density,
+}
+
+
+def extract_features(prompt: str | PreparedPrompt) -> dict[str, float]:
+    """Compute every registered feature for ``prompt``."""
+    prompt = prepare(prompt)
+    return {name: feature(prompt) for name, feature in FEATURES.items()}
+
+
+def extract_features_batch(prompts: list[str | PreparedPrompt]) -> list[dict[str, float]]:
+    """Compute every registered feature for each prompt, equal to ``extract_features``.
+
+    Character statistics and instruction-token hits for the whole batch are
+    counted with NumPy array operations over one codepoint buffer. Features
+    without a batched implementation, and every feature when NumPy is not
+    installed or the batch is under ``BATCH_MIN_CHARS``, are computed per
+    prompt.
+    """
+    prepared = [prepare(prompt) for prompt in prompts]
+    if not prepared:
+        return []
+    if sum(len(p.text) for p in prepared) < BATCH_MIN_CHARS:
+        return [extract_features(p) for p in prepared]
+    try:
+        batched = _batched_features(prepared)
+    except ImportError:
+        batched = {}
+
+    columns = {
+        name: batched[name] if name in batched else [feature(p) for p in prepared]
+        for name, feature in FEATURES.items()
+    }
+    return [{name: column[i] for name, column in columns.items()} for i in range(len(prepared))]
+
+
+def _batched_features(prompts: list[PreparedPrompt]) -> dict[str, list[float]]:
+    import numpy as np
+
+    count = len(prompts)
+    lengths = np.array([len(p.text) for p in prompts])
+
+    # Character histogram of every prompt at once, from one codepoint buffer
+    lowered = [p.lower for p in prompts]
+    codepoints = np.frombuffer(
+        "".join(lowered).encode("utf-32-le", "surrogatepass"), dtype=np.uint32
+    ).astype(np.int64)
+    owners = np.repeat(np.arange(count), [len(text) for text in lowered])
+    if all(text.isascii() for text in lowered):
+        # Dense (prompt, byte) table: one bincount, no sorting
+        table = np.bincount(owners * 128 + codepoints, minlength=count * 128).reshape(count, 128)
+        key_owners, key_chars = np.nonzero(table)
+        char_counts = table[key_owners, key_chars]
+    else:
+        keys, char_counts = np.unique((owners << 32) | codepoints, return_counts=True)
+        key_owners, key_chars = keys >> 32, keys & 0xFFFFFFFF
+
+    is_special = np.isin(key_chars, _SPECIAL_CODEPOINTS)
+    special = np.bincount(key_owners[is_special], weights=char_counts[is_special], minlength=count)
+
+    # Only the per-distinct-character terms are left to Python; fsum makes the
+    # result independent of the order they are visited in.
+    terms: list[list[float]] = [[] for _ in range(count)]
+    totals = lengths.tolist()
+    for owner, c in zip(key_owners.tolist(), char_counts.tolist()):
+        terms[owner].append((c / totals[owner]) * math.log2(c / totals[owner]))
+    entropy = [-math.fsum(t) if t else 0.0 for t in terms]
+
+    word_counts = np.array([len(p.words) for p in prompts])
+    instruction = np.array(
+        [sum(map(INSTRUCTION_TOKENS.__contains__, p.words)) for p in prompts]
+    )
+    with np.errstate(invalid="ignore", divide="ignore"):
+        token_ratio = np.where(word_counts > 0, instruction / word_counts, 0.0)
+        special_density = np.where(lengths > 0, special / lengths, 0.0)
+
+    return {
+        "entropy": entropy,
+        "token_ratio": token_ratio.tolist(),
+        "special": special_density.tolist(),
+    }
 
 
 class HeuristicDetector(BaseDetector):
@@ -78,11 +179,22 @@ class HeuristicDetector(BaseDetector):
     STRUCTURAL_THRESHOLD = 0.3
     SPECIAL_CHAR_THRESHOLD = 0.05
 
-    def detect(self, prompt: str) -> DetectorResult:
-        entropy = _char_entropy(prompt)
-        token_ratio = _instruction_token_ratio(prompt)
-        structural = _structural_marker_density(prompt)
-        special = _special_char_density(prompt)
+    def detect(self, prompt: str | PreparedPrompt) -> DetectorResult:
+        prompt = prepare(prompt)
+        return self._score(extract_features(prompt), len(prompt.text))
+
+    def detect_batch(self, prompts: list[str | PreparedPrompt]) -> list[DetectorResult]:
+        prepared = [prepare(prompt) for prompt in prompts]
+        return [
+            self._score(features, len(p.text))
+            for p, features in zip(prepared, extract_features_batch(prepared))
+        ]
+
+    def _score(self, features: dict[str, float], length: int) -> DetectorResult:
+        entropy = features["entropy"]
+        token_ratio = features["token_ratio"]
+        structural = features["structural"]
+        special = features["special"]
 
         signals = []
         scores = []
@@ -99,7 +211,7 @@ class HeuristicDetector(BaseDetector):
             signals.append(f"special_char_density={special:.3f}")
             scores.append(min(special / 0.15, 1.0))
 
-        if entropy > self.ENTROPY_THRESHOLD and len(prompt) > 50:
+        if entropy > self.ENTROPY_THRESHOLD and length > 50:
             signals.append(f"high_entropy={entropy:.2f}")
             scores.append(0.3)
 
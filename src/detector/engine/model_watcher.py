@@ -0,0 +1,82 @@
+"""Background reload of the ML model when its artifacts change on disk."""
+
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Callable
+
+from detector.logging_.structured_logger import get_logger
+
+
+def _signature(paths: list[Path]) -> tuple:
+    """(path, inode, mtime, size) of every file that exists, so a rewrite or replace changes it."""
+    signature = []
+    for path in paths:
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        signature.append((str(path), stat.st_ino, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+class ModelWatcher:
+    """Polls model artifact files and calls ``reload`` after they change.
+
+    A change is only acted on once the files have stayed the same for a
+    whole ``interval_seconds``, so a model still being written out is not
+    picked up half-way. A failed reload is logged and not retried until the
+    files change again; the current model keeps serving meanwhile.
+    """
+
+    def __init__(
+        self,
+        paths: Callable[[], list[Path]],
+        reload: Callable[[], object],
+        interval_seconds: float = 5.0,
+        start: bool = True,
+    ):
+        self.paths = paths
+        self.reload = reload
+        self.interval = interval_seconds
+        self.reloads = 0
+        self.failures = 0
+        self._loaded = _signature(paths())
+        self._seen = self._loaded
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+        if start:
+            self._thread.start()
+
+    def check(self) -> bool:
+        """Poll once; True if this poll reloaded the model."""
+        current = _signature(self.paths())
+        settled = current == self._seen
+        self._seen = current
+        if not settled or current == self._loaded:
+            return False
+
+        self._loaded = current
+        try:
+            self.reload()
+        except Exception as exc:
+            self.failures += 1
+            get_logger("detector.model").warning(
+                "Model reload rejected, keeping the current model: %s", exc
+            )
+            return False
+        self.reloads += 1
+        return True
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception:
+                get_logger("detector.model").exception("Model watcher poll failed")
@@ -0,0 +1,50 @@
+"""Per-request views of a prompt shared by every detector."""
+
+from __future__ import annotations
+
+import re
+from collections import Counter
+from functools import cached_property
+
+from detector.patterns.pattern_set import fold_case
+
+_WORD = re.compile(r"\w+")
+
+
+class PreparedPrompt:
+    """A prompt plus the derived forms detectors consume.
+
+    Each view is computed on first access and then reused, so a request
+    lowercases, tokenizes and counts the prompt at most once no matter how
+    many detectors look at it.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    @cached_property
+    def lower(self) -> str:
+        return self.text.lower()
+
+    @cached_property
+    def folded(self) -> str:
+        """Case-folded form that ASCII literals match as ``re.IGNORECASE`` would."""
+        return self.lower if self.text.isascii() else fold_case(self.text)
+
+    @cached_property
+    def words(self) -> list[str]:
+        """Lowercased ``\\w+`` tokens."""
+        return _WORD.findall(self.lower)
+
+    @cached_property
+    def char_counts(self) -> Counter:
+        """Occurrences of each character of the lowercased text."""
+        return Counter(self.lower)
+
+
+def prepare(prompt: str | PreparedPrompt) -> PreparedPrompt:
+    """Wrap ``prompt`` unless it is already prepared."""
+    return prompt if isinstance(prompt, PreparedPrompt) else PreparedPrompt(prompt)
@@ -2,38 +2,97 @@
 
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
+from detector import metrics
+from detector.config import settings
 from detector.engine.base import BaseDetector
-from detector.models import DetectorResult, AttackCategory
-from detector.patterns.injection_patterns import ALL_PATTERNS
+from detector.engine.prepared import PreparedPrompt, prepare
+from detector.models import AttackCategory, DetectorResult, MatchSpan
+from detector.patterns.pattern_set import PatternSet
+
+if TYPE_CHECKING:
+    from detector.patterns.injection_patterns import InjectionPattern
+
+# Confidence reported when the time budget ran out before any pattern matched.
+# Padding a prompt until the scan gives up is itself an evasion attempt, so an
+# incomplete scan is never reported as clean.
+BUDGET_EXCEEDED_CONFIDENCE = 0.5
 
 
 class RegexDetector(BaseDetector):
     name = "regex"
 
-    def detect(self, prompt: str) -> DetectorResult:
-        triggered_patterns = []
+    def __init__(
+        self,
+        patterns: list[InjectionPattern] | None = None,
+        time_budget_ms: float | None = None,
+        guarded_max_chars: int | None = None,
+    ):
+        if patterns is None:
+            # Deferred so importing the detector doesn't compile the pattern library
+            from detector.patterns.injection_patterns import ALL_PATTERNS
+            patterns = ALL_PATTERNS
+        self._pattern_set = PatternSet(patterns)
+        if time_budget_ms is None:
+            time_budget_ms = settings.regex_time_budget_ms
+        if guarded_max_chars is None:
+            guarded_max_chars = settings.regex_guarded_max_chars
+        # Zero disables either limit
+        self._budget_seconds = time_budget_ms / 1000 if time_budget_ms > 0 else None
+        self._guarded_max_chars = guarded_max_chars if guarded_max_chars > 0 else None
 
-        for pattern in ALL_PATTERNS:
-            if pattern.pattern.search(prompt):
-                triggered_patterns.append(pattern)
+    def max_match_chars(self, run_chars: int) -> int:
+        """Longest text any pattern matches when its unbounded runs span ``run_chars`` or less."""
+        return self._pattern_set.max_match_chars(run_chars)
 
-        if not triggered_patterns:
+    def detect(self, prompt: str | PreparedPrompt) -> DetectorResult:
+        prompt = prepare(prompt)
+        matches, skipped = self._pattern_set.scan_within(
+            prompt.text,
+            folded=prompt.folded,
+            budget_seconds=self._budget_seconds,
+            guarded_max_chars=self._guarded_max_chars,
+        )
+        note = ""
+        if skipped:
+            metrics.REGEX_BUDGET_EXCEEDED.inc()
+            note = f" Time budget exceeded; skipped: {', '.join(p.name for p in skipped)}."
+
+        if not matches and not skipped:
             return DetectorResult(
                 detector_name=self.name,
                 triggered=False,
                 confidence=0.0,
                 categories=[],
                 details="No known injection patterns detected.",
+                matches=[],
             )
 
-        max_confidence = max(p.confidence for p in triggered_patterns)
+        triggered_patterns = [pattern for pattern, _ in matches]
+
+        confidences = [p.confidence for p in triggered_patterns]
         categories = list({p.category for p in triggered_patterns})
+        if skipped:
+            confidences.append(BUDGET_EXCEEDED_CONFIDENCE)
+            categories.append(AttackCategory.RESOURCE_EXHAUSTION)
         pattern_names = [p.name for p in triggered_patterns]
+        details = (
+            f"Matched patterns: {', '.join(pattern_names)}"
+            if pattern_names
+            else "No known injection patterns detected in the patterns searched."
+        )
 
         return DetectorResult(
             detector_name=self.name,
             triggered=True,
-            confidence=max_confidence,
+            confidence=max(confidences),
             categories=categories,
-            details=f"Matched patterns: {', '.join(pattern_names)}",
+            details=details + note,
+            # The scan's own Match objects, so reporting spans costs no extra search
+            matches=[
+                MatchSpan(start=match.start(), end=match.end(), pattern=pattern.name)
+                for pattern, match in matches
+            ],
+            skipped_patterns=[p.name for p in skipped],
         )
@@ -0,0 +1,78 @@
+"""Overlapping windows for analyzing very long prompts.
+
+Scoring a multi-megabyte prompt as one document is slow (and dilutes the
+heuristic and ML signals over the whole text), so the ensemble scores
+prompts above ``long_input_chars`` window by window instead. Consecutive
+windows overlap by ``overlap`` characters, so every stretch of text up to
+that long lies entirely inside at least one window: a pattern match no
+longer than the overlap is never cut in two by a window boundary.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class WindowPlan:
+    """How a long prompt is split, and which of its windows fit the work budget."""
+
+    spans: list[tuple[int, int]]
+    total: int
+    window_chars: int
+    overlap_chars: int
+
+    @property
+    def unscored_from(self) -> int | None:
+        """Offset where scoring stopped for lack of budget, or None if every window fits."""
+        if len(self.spans) == self.total:
+            return None
+        return self.spans[-1][1] if self.spans else 0
+
+
+def split(length: int, window_chars: int, overlap_chars: int) -> list[tuple[int, int]]:
+    """(start, end) of windows covering ``length`` characters, each overlapping the next."""
+    if not 0 <= overlap_chars < window_chars:
+        raise ValueError(
+            f"window overlap must be at least 0 and below the window size ({window_chars}), "
+            f"got {overlap_chars}"
+        )
+    stride = window_chars - overlap_chars
+    spans = []
+    start = 0
+    while True:
+        end = min(start + window_chars, length)
+        spans.append((start, end))
+        if end >= length:
+            return spans
+        start += stride
+
+
+def plan(length: int, window_chars: int, overlap_chars: int, budget_chars: int) -> WindowPlan:
+    """Split ``length`` characters and keep the leading windows that fit ``budget_chars``.
+
+    The budget counts every character scored, overlaps included; 0 means
+    no limit. The first window is always scored.
+    """
+    spans = split(length, window_chars, overlap_chars)
+    kept = spans
+    if budget_chars > 0:
+        used = 0
+        for count, (start, end) in enumerate(spans):
+            used += end - start
+            if used > budget_chars and count:
+                kept = spans[:count]
+                break
+    return WindowPlan(kept, len(spans), window_chars, overlap_chars)
+
+
+def merge(scored: list[tuple[int, int, float]]) -> list[tuple[int, int, float]]:
+    """Join overlapping or touching (start, end, score) ranges, keeping the highest score."""
+    merged: list[tuple[int, int, float]] = []
+    for start, end, score in sorted(scored):
+        if merged and start <= merged[-1][1]:
+            first, last, best = merged[-1]
+            merged[-1] = (first, max(last, end), max(best, score))
+        else:
+            merged.append((start, end, score))
+    return merged
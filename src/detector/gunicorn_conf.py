@@ -0,0 +1,29 @@
+"""Gunicorn settings for pre-fork serving with uvicorn workers.
+
+Usage:
+    gunicorn detector.app:app -c python:detector.gunicorn_conf [-w WORKERS]
+
+Requires: pip install .[prefork]
+
+Unlike ``uvicorn --workers``, which spawns fresh interpreters that each
+compile the patterns and load the model, the gunicorn master does that
+once and forks the workers from it, so they share those pages
+copy-on-write.
+"""
+
+from detector import services
+
+bind = "0.0.0.0:8000"
+workers = 4
+worker_class = "uvicorn_worker.UvicornWorker"
+# Import the app in the master too, so FastAPI and pydantic are shared as well
+preload_app = True
+
+
+def when_ready(server):
+    # Runs in the master right before the first workers are forked
+    services.preload()
+
+
+def post_fork(server, worker):
+    services.after_fork()
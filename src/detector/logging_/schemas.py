@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, fields
 from datetime import datetime, timezone
 
 
@@ -22,9 +22,11 @@ class AnalysisLogEvent:
     latency_ms: float = 0.0
     source_ip: str = ""
     request_id: str = ""
+    model_version: str = ""
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        # Shallow: the event is only serialized, so its lists needn't be copied as asdict would
+        return {field.name: getattr(self, field.name) for field in fields(self)}
 
     @classmethod
     def from_analysis(
@@ -39,6 +41,7 @@ class AnalysisLogEvent:
         latency_ms: float,
         source_ip: str = "",
         request_id: str = "",
+        model_version: str = "",
     ) -> AnalysisLogEvent:
         return cls(
             timestamp=datetime.now(timezone.utc).isoformat(),
@@ -52,4 +55,5 @@ class AnalysisLogEvent:
             latency_ms=latency_ms,
             source_ip=source_ip,
             request_id=request_id,
+            model_version=model_version,
         )
@@ -1,34 +1,178 @@
-"""Structured JSON logger for SIEM-consumable output."""
+"""Structured JSON logger for SIEM-consumable output.
+
+By default (``log_async``) every logger shares one ``AsyncJSONHandler``:
+the request path only appends the record to an in-memory buffer, and a
+background thread formats and writes buffered records to stdout in
+batches, so a slow log sink never adds to request latency. Set
+``DETECTOR_LOG_ASYNC=false`` to write each record inline instead.
+"""
 
 from __future__ import annotations
 
 import json
 import logging
+import os
 import sys
+import threading
+from collections import deque
 from datetime import datetime, timezone
 
+from detector.config import settings
 from detector.logging_.schemas import AnalysisLogEvent
 
+DROP_POLICIES = ("newest", "oldest")
+
 
 class JSONFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:
         log_data = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            # When the record was made, not when a background writer got to it
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
         }
         if hasattr(record, "event_data"):
-            log_data["event"] = record.event_data
+            event = record.event_data
+            # Analysis events are attached as-is and only converted here
+            log_data["event"] = event.to_dict() if isinstance(event, AnalysisLogEvent) else event
         return json.dumps(log_data)
 
 
+class AsyncJSONHandler(logging.Handler):
+    """Buffers records and writes them as JSON lines from a background thread.
+
+    ``emit`` only appends to a buffer of at most ``max_queue`` records. When
+    the buffer is full a record is dropped and counted: the new one under
+    the ``newest`` policy, or the oldest buffered one under ``oldest``. The
+    writer thread formats up to ``max_batch`` records at a time and writes
+    them to the stream in one call.
+    """
+
+    def __init__(
+        self,
+        stream=None,
+        max_queue: int = 10_000,
+        max_batch: int = 256,
+        drop_policy: str = "newest",
+    ):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"drop policy must be one of {DROP_POLICIES}, got {drop_policy!r}")
+        super().__init__()
+        # None writes to whatever sys.stdout is at the time
+        self.stream = stream
+        self.max_queue = max_queue
+        self.max_batch = max_batch
+        self.drop_policy = drop_policy
+        self.written = 0
+        self.dropped = 0
+        self._start()
+        # The writer thread doesn't survive a fork (pre-fork workers); give each child its own
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self) -> None:
+        if not self._closed:
+            self._start()
+
+    def _start(self) -> None:
+        self._buffer: deque[logging.LogRecord] = deque()
+        self._writing = 0
+        self._closed = False
+        self._cond = threading.Condition(threading.Lock())
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        with self._cond:
+            if self._closed:
+                self.dropped += 1
+                return
+            if len(self._buffer) >= self.max_queue:
+                self.dropped += 1
+                if self.drop_policy == "newest":
+                    return
+                self._buffer.popleft()
+            self._buffer.append(record)
+            self._cond.notify()
+
+    def flush(self, timeout: float | None = 5.0) -> None:
+        """Block until every record emitted so far has been written."""
+        with self._cond:
+            self._cond.wait_for(lambda: not self._buffer and not self._writing, timeout)
+
+    def close(self) -> None:
+        """Write the remaining records and stop the writer thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread.is_alive():
+            self._thread.join(5.0)
+        super().close()
+
+    def stats(self) -> dict:
+        return {"backlog": len(self._buffer), "written": self.written, "dropped": self.dropped}
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._buffer or self._closed)
+                if not self._buffer:
+                    return
+                batch = [
+                    self._buffer.popleft() for _ in range(min(len(self._buffer), self.max_batch))
+                ]
+                self._writing = len(batch)
+            self._write(batch)
+            with self._cond:
+                self._writing = 0
+                self._cond.notify_all()
+
+    def _write(self, batch: list[logging.LogRecord]) -> None:
+        lines = []
+        for record in batch:
+            try:
+                lines.append(self.format(record))
+            except Exception:
+                self.handleError(record)
+        stream = self.stream if self.stream is not None else sys.stdout
+        try:
+            stream.write("\n".join(lines) + "\n")
+            stream.flush()
+        except Exception:
+            with self._cond:
+                self.dropped += len(lines)
+            return
+        with self._cond:
+            self.written += len(lines)
+
+
+_handler: logging.Handler | None = None
+_handler_lock = threading.Lock()
+
+
+def get_handler() -> logging.Handler:
+    """The handler every structured logger in this process writes through."""
+    global _handler
+    if _handler is None:
+        with _handler_lock:
+            if _handler is None:
+                if settings.log_async:
+                    handler = AsyncJSONHandler(
+                        max_queue=settings.log_queue_size,
+                        max_batch=settings.log_batch_size,
+                        drop_policy=settings.log_drop_policy,
+                    )
+                else:
+                    handler = logging.StreamHandler(sys.stdout)
+                handler.setFormatter(JSONFormatter())
+                _handler = handler
+    return _handler
+
+
 def get_logger(name: str = "detector") -> logging.Logger:
     logger = logging.getLogger(name)
     if not logger.handlers:
-        handler = logging.StreamHandler(sys.stdout)
-        handler.setFormatter(JSONFormatter())
-        logger.addHandler(handler)
+        logger.addHandler(get_handler())
         logger.setLevel(logging.INFO)
     return logger
 
@@ -40,9 +184,10 @@ def log_analysis(event: AnalysisLogEvent) -> None:
         level=logging.INFO,
         fn="",
         lno=0,
-        msg=f"Analysis: {event.verdict} (confidence={event.confidence:.4f})",
-        args=(),
+        msg="Analysis: %s (confidence=%.4f)",
+        args=(event.verdict, event.confidence),
         exc_info=None,
     )
-    record.event_data = event.to_dict()  # type: ignore[attr-defined]
+    # Converted to a dict by the formatter, off the request path in async mode
+    record.event_data = event  # type: ignore[attr-defined]
     logger.handle(record)
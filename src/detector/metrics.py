@@ -0,0 +1,203 @@
+"""In-process metrics registry rendered in the Prometheus text exposition format."""
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left
+from typing import Callable
+
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+)
+PROMPT_LENGTH_BUCKETS = (16, 64, 256, 1024, 4096, 16384, 65536, 262144)
+
+
+class _Sharded:
+    """A fixed-size vector of running totals with one shard per writing thread.
+
+    Each thread only ever adds to its own shard, so updates need no lock;
+    the lock is taken once per thread to register the shard, and on read.
+    """
+
+    def __init__(self, size: int):
+        self._size = size
+        self._local = threading.local()
+        self._shards: list[list[float]] = []
+        self._lock = threading.Lock()
+
+    def shard(self) -> list[float]:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = [0.0] * self._size
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def totals(self) -> list[float]:
+        with self._lock:
+            shards = list(self._shards)
+        return [sum(column) for column in zip(*shards)] if shards else [0.0] * self._size
+
+    def drain(self) -> list[float]:
+        """Return the totals and zero every shard. Only safe while no other thread writes."""
+        totals = self.totals()
+        with self._lock:
+            for shard in self._shards:
+                shard[:] = [0.0] * self._size
+        return totals
+
+
+class _Family:
+    """A metric and its children, one per combination of label values."""
+
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._children: dict[tuple[str, ...], _Sharded] = {}
+        self._lock = threading.Lock()
+
+    def _child(self, labels: tuple[str, ...]) -> _Sharded:
+        child = self._children.get(labels)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(labels, _Sharded(self._width))
+        return child
+
+    @property
+    def _width(self) -> int:
+        return 1
+
+    def _label_str(self, labels: tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{n}="{v}"' for n, v in zip(self.labelnames, labels)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for labels, child in sorted(self._children.items()):
+            lines.extend(self._samples(labels, child.totals()))
+        return lines
+
+    def _samples(self, labels: tuple[str, ...], totals: list[float]) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Family):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._child(labels).shard()[0] += amount
+
+    def value(self, *labels: str) -> float:
+        return self._child(labels).totals()[0]
+
+    def _samples(self, labels, totals):
+        return [f"{self.name}{self._label_str(labels)} {_format(totals[0])}"]
+
+
+class Histogram(_Family):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets=LATENCY_BUCKETS
+    ):
+        self.buckets = tuple(buckets)
+        super().__init__(name, help, labelnames)
+
+    @property
+    def _width(self) -> int:
+        # One slot per bucket, one for +Inf, then the running sum
+        return len(self.buckets) + 2
+
+    def observe(self, value: float, *labels: str, count: int = 1) -> None:
+        """Record ``count`` observations of ``value``."""
+        shard = self._child(labels).shard()
+        shard[bisect_left(self.buckets, value)] += count
+        shard[-1] += value * count
+
+    def count(self, *labels: str) -> int:
+        return int(sum(self._child(labels).totals()[:-1]))
+
+    def drain(self) -> dict[tuple[str, ...], list[float]]:
+        """Take every child's totals and reset them, for shipping to another process."""
+        with self._lock:
+            children = dict(self._children)
+        return {labels: child.drain() for labels, child in children.items()}
+
+    def merge(self, drained: dict[tuple[str, ...], list[float]]) -> None:
+        """Add totals produced by ``drain`` in another process."""
+        for labels, totals in drained.items():
+            shard = self._child(labels).shard()
+            for i, value in enumerate(totals):
+                shard[i] += value
+
+    def _samples(self, labels, totals):
+        lines = []
+        cumulative = 0.0
+        for bound, count in zip(self.buckets + (float("inf"),), totals):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else _format(bound)
+            bucket_labels = self._label_str(labels, 'le="' + le + '"')
+            lines.append(f"{self.name}_bucket{bucket_labels} {_format(cumulative)}")
+        lines.append(f"{self.name}_sum{self._label_str(labels)} {_format(totals[-1])}")
+        lines.append(f"{self.name}_count{self._label_str(labels)} {_format(cumulative)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Metrics owned by this process, plus values read from elsewhere at scrape time."""
+
+    def __init__(self):
+        self._families: dict[str, _Family] = {}
+        self._callbacks: dict[str, tuple[str, str, Callable[[], float]]] = {}
+
+    def counter(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._families.setdefault(name, Counter(name, help, labelnames))
+
+    def histogram(
+        self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets=LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._families.setdefault(name, Histogram(name, help, labelnames, buckets))
+
+    def register_callback(self, name: str, help: str, kind: str, fn: Callable[[], float]) -> None:
+        """Expose ``fn()`` as a single ``gauge`` or ``counter`` sample, read on every render."""
+        self._callbacks[name] = (help, kind, fn)
+
+    def render(self) -> str:
+        lines = []
+        for family in self._families.values():
+            lines.extend(family.render())
+        for name, (help, kind, fn) in self._callbacks.items():
+            lines.extend(
+                [f"# HELP {name} {help}", f"# TYPE {name} {kind}", f"{name} {_format(fn())}"]
+            )
+        return "\n".join(lines) + "\n"
+
+
+def _format(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+REGISTRY = MetricsRegistry()
+
+ANALYSES = REGISTRY.counter(
+    "detector_analyses_total", "Prompts analyzed, by verdict.", ("verdict",)
+)
+ANALYSIS_LATENCY = REGISTRY.histogram(
+    "detector_analysis_latency_seconds", "End-to-end analysis latency per prompt."
+)
+DETECTOR_LATENCY = REGISTRY.histogram(
+    "detector_layer_latency_seconds", "Time each detector spent per prompt.", ("detector",)
+)
+PROMPT_LENGTH = REGISTRY.histogram(
+    "detector_prompt_length_chars", "Length of analyzed prompts in characters.",
+    buckets=PROMPT_LENGTH_BUCKETS,
+)
+REGEX_BUDGET_EXCEEDED = REGISTRY.counter(
+    "detector_regex_budget_exceeded_total",
+    "Prompts whose regex scan ran out of time and skipped patterns.",
+)
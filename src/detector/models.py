@@ -6,6 +6,8 @@ from enum import Enum
 
 from pydantic import BaseModel, Field
 
+from detector.config import settings
+
 
 class Verdict(str, Enum):
     CLEAN = "CLEAN"
@@ -20,6 +22,7 @@ class AttackCategory(str, Enum):
     DELIMITER_INJECTION = "delimiter_injection"
     INDIRECT_INJECTION = "indirect_injection"
     CONTEXT_MANIPULATION = "context_manipulation"
+    RESOURCE_EXHAUSTION = "resource_exhaustion"
     NONE = "none"
 
 
@@ -28,27 +31,133 @@ class AnalysisRequest(BaseModel):
     metadata: dict | None = Field(default=None, description="Optional metadata about the request")
 
 
+class BatchAnalysisRequest(BaseModel):
+    items: list[AnalysisRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.max_batch_size,
+        description="Prompts to analyze, scored together and answered in order",
+    )
+
+
+class MatchSpan(BaseModel):
+    start: int
+    end: int
+    pattern: str
+
+
 class DetectorResult(BaseModel):
     detector_name: str
     triggered: bool
     confidence: float = Field(ge=0.0, le=1.0)
     categories: list[AttackCategory] = Field(default_factory=list)
     details: str = ""
+    matches: list[MatchSpan] | None = Field(
+        default=None,
+        description="Character span of each matched pattern's first match (regex detector only)",
+    )
+    skipped_patterns: list[str] = Field(
+        default_factory=list,
+        description="Patterns left unsearched when the scan's time budget ran out (regex only)",
+    )
+
+
+class WindowSpan(BaseModel):
+    start: int
+    end: int
+    verdict: Verdict
+    confidence: float = Field(ge=0.0, le=1.0)
+
+
+class LongInputSummary(BaseModel):
+    windows: int = Field(description="Windows the prompt was split into")
+    windows_scored: int = Field(description="Windows scored within the work budget")
+    window_chars: int
+    overlap_chars: int
+    flagged: list[WindowSpan] = Field(
+        default_factory=list,
+        description="Character ranges of windows that weren't clean, overlapping ones merged",
+    )
+    unscored_from: int | None = Field(
+        default=None, description="Offset where the work budget ran out; later text was not scored"
+    )
 
 
 class AnalysisResponse(BaseModel):
     verdict: Verdict
     confidence: float = Field(ge=0.0, le=1.0)
     triggered_detectors: list[DetectorResult]
+    skipped_detectors: list[str] = Field(
+        default_factory=list,
+        description="Detectors not run because the verdict was already decided (cascade mode)",
+    )
     primary_category: AttackCategory
     explanation: str
     prompt_hash: str = Field(description="SHA-256 hash of the prompt (privacy)")
+    model_version: str = Field(
+        default="none", description="Version of the ML model that scored the prompt"
+    )
+    long_input: LongInputSummary | None = Field(
+        default=None, description="How a prompt above the long-input threshold was windowed"
+    )
+
+
+class BatchAnalysisResponse(BaseModel):
+    results: list[AnalysisResponse]
+
+
+class CacheStats(BaseModel):
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+    hit_rate: float
+
+
+class StoreStats(BaseModel):
+    backlog: int
+    written: int
+    dropped: int
+
+
+class LogStats(BaseModel):
+    backlog: int
+    written: int
+    dropped: int
+
+
+class ExecutorStats(BaseModel):
+    mode: str
+    workers: int
+    in_flight: int
+    queue_depth: int
+    completed: int
+    wait_ms_avg: float
+    wait_ms_max: float
+
+
+class ModelReloadResponse(BaseModel):
+    model_version: str
+    previous_version: str
+
+
+class ReadyResponse(BaseModel):
+    ready: bool
+    startup_ms: dict[str, float] = Field(
+        default_factory=dict, description="Time spent in each startup phase so far"
+    )
 
 
 class HealthResponse(BaseModel):
     status: str = "healthy"
     version: str
-    detectors_loaded: list[str]
+    startup: str = "ready"
+    detectors_loaded: list[str] = Field(default_factory=list)
+    model_version: str = "none"
+    cache: CacheStats | None = None
+    store: StoreStats | None = None
+    executor: ExecutorStats | None = None
+    log: LogStats | None = None
 
 
 class StatsResponse(BaseModel):
@@ -0,0 +1,58 @@
+"""Aho-Corasick automaton for finding many literals in one pass over a string."""
+
+from __future__ import annotations
+
+from collections import deque
+
+
+class AhoCorasick:
+    """Find which of a fixed set of literals occur in a text, in linear time.
+
+    The goto/failure automaton is flattened into a deterministic transition
+    table at build time, so scanning costs one dict lookup per character
+    regardless of how many literals are indexed. Overlapping occurrences and
+    literals nested inside longer ones are all reported.
+    """
+
+    def __init__(self, literals):
+        self.literals = frozenset(literal for literal in literals if literal)
+
+        goto: list[dict[str, int]] = [{}]
+        outputs: list[set[str]] = [set()]
+        for literal in sorted(self.literals):
+            state = 0
+            for char in literal:
+                if char not in goto[state]:
+                    goto.append({})
+                    outputs.append(set())
+                    goto[state][char] = len(goto) - 1
+                state = goto[state][char]
+            outputs[state].add(literal)
+
+        # Breadth-first order guarantees a state's failure target is complete
+        # before the state itself is flattened.
+        fail = [0] * len(goto)
+        transitions: list[dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            transitions[state] = {**transitions[fail[state]], **goto[state]}
+            outputs[state] |= outputs[fail[state]]
+            for char, child in goto[state].items():
+                fail[child] = transitions[fail[state]].get(char, 0) if state else 0
+                queue.append(child)
+
+        self._transitions = transitions
+        self._outputs = [frozenset(out) for out in outputs]
+
+    def find(self, text: str) -> set[str]:
+        """Return the indexed literals that occur anywhere in ``text``."""
+        transitions = self._transitions
+        outputs = self._outputs
+        found: set[str] = set()
+        state = 0
+        for char in text:
+            state = transitions[state].get(char, 0)
+            if outputs[state]:
+                found |= outputs[state]
+        return found
@@ -27,4 +27,8 @@ CATEGORY_DESCRIPTIONS: dict[AttackCategory, str] = {
         "Manipulates the conversational context or attempts to alter LLM behavior, "
         "e.g., fake conversation history, simulated tool outputs"
     ),
+    AttackCategory.RESOURCE_EXHAUSTION: (
+        "Pads the prompt so that scanning it runs out of time before every pattern is checked, "
+        "e.g., kilobytes of near-miss keywords ahead of the payload"
+    ),
 }
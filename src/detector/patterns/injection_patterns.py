@@ -214,14 +214,14 @@ ENCODING_EVASION_PATTERNS = _compile([
 DELIMITER_INJECTION_PATTERNS = _compile([
     {
         "name": "triple_quotes",
-        "regex": r'"""[\s\S]*?(system|instruction|prompt|ignore)',
+        "regex": r'"""(?:(?!""")[\s\S])*?(system|instruction|prompt|ignore)',
         "category": AttackCategory.DELIMITER_INJECTION,
         "confidence": 0.85,
         "description": "Uses triple quotes to inject system-like context",
     },
     {
         "name": "hash_delimiter",
-        "regex": r"#{3,}\s*(system|instruction|end|new\s+section)",
+        "regex": r"(?<!#)#{3,}+\s*(system|instruction|end|new\s+section)",
         "category": AttackCategory.DELIMITER_INJECTION,
         "confidence": 0.8,
         "description": "Uses hash delimiters to create fake section boundaries",
@@ -242,7 +242,7 @@ DELIMITER_INJECTION_PATTERNS = _compile([
     },
     {
         "name": "separator_override",
-        "regex": r"[-=]{5,}\s*(system|new|override|instructions?|end\s+of)",
+        "regex": r"(?<![-=])[-=]{5,}+\s*(system|new|override|instructions?|end\s+of)",
         "category": AttackCategory.DELIMITER_INJECTION,
         "confidence": 0.8,
         "description": "Uses visual separators to create fake boundaries",
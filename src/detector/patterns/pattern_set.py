@@ -0,0 +1,286 @@
+"""Compiled pattern-set engine for the regex detector.
+
+Searching every ``InjectionPattern`` one by one scans the prompt ~40 times.
+A ``PatternSet`` instead extracts, at build time, the literals each pattern
+requires (``ignore``, ``system``, ``base64``, ``[inst``...). All of them are
+indexed in one Aho-Corasick automaton that runs once over the case-folded
+prompt, and only patterns whose required literals all occurred are verified
+with their full regex. Patterns without any required literal are always
+verified, so results are identical to searching each pattern in turn.
+
+Patterns that ``redos.analyze`` finds can backtrack exponentially are
+rejected when the set is built. Those that can backtrack polynomially are
+"guarded": verified after all the others, and optionally over bounded,
+overlapping slices of a long prompt rather than all of it at once, so that
+``scan_within`` can hold a time budget.
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from re import _constants as sre_constants
+from re import _parser as sre_parse
+from typing import TYPE_CHECKING, Callable
+
+from detector.logging_.structured_logger import get_logger
+from detector.patterns.aho_corasick import AhoCorasick
+from detector.patterns.redos import EXPONENTIAL, analyze
+
+if TYPE_CHECKING:
+    # Only for annotations: importing the library compiles every pattern
+    from detector.patterns.injection_patterns import InjectionPattern
+
+# Shorter literals ("a", ":") occur in almost every prompt and filter nothing.
+MIN_LITERAL_LENGTH = 2
+
+# Longest stretch a single unbounded run in a pattern (the whitespace or filler
+# between its keywords) is assumed to cover when sizing slice and window overlaps
+RUN_CHARS = 64
+
+# Non-ASCII characters that ``re.IGNORECASE`` treats as equal to an ASCII letter.
+# Every other character either folds to itself or to a non-ASCII character.
+_ASCII_CASE_FOLDS = str.maketrans({"\u0130": "i", "\u0131": "i", "\u017f": "s", "\u212a": "k"})
+
+_REPEATS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT, sre_constants.POSSESSIVE_REPEAT)
+
+
+def fold_case(text: str) -> str:
+    """Lowercase text so that ASCII literals match it as ``re.IGNORECASE`` would."""
+    if not text.isascii():
+        text = text.translate(_ASCII_CASE_FOLDS)
+    return text.lower()
+
+
+def _best_clause(clauses: list[frozenset[str]]) -> frozenset[str] | None:
+    """Pick the most selective clause: the one whose shortest literal is longest."""
+    if not clauses:
+        return None
+    return max(clauses, key=lambda clause: min(len(lit) for lit in clause))
+
+
+def _requirements(subpattern) -> list[frozenset[str]]:
+    """Literal requirements of a parsed regex, as clauses that must all hold.
+
+    Each clause is a set of case-folded literals of which at least one must
+    appear in the matched text. Anything that is not a plain literal run
+    (classes, optional repeats, lookarounds) contributes no requirement.
+    """
+    clauses: list[frozenset[str]] = []
+    run: list[str] = []
+
+    def flush() -> None:
+        if len(run) >= MIN_LITERAL_LENGTH:
+            clauses.append(frozenset({"".join(run)}))
+        run.clear()
+
+    for op, av in subpattern:
+        if op is sre_constants.LITERAL and av < 128:
+            run.append(chr(av).lower())
+            continue
+        if op is sre_constants.BRANCH:
+            # The parser hoists prefixes shared by all alternatives out of the
+            # branch ("assistant|ai" -> "a" + "ssistant|i"), so glue them back.
+            prefix = [(sre_constants.LITERAL, ord(char)) for char in run]
+            alternatives = [_best_clause(_requirements(prefix + list(alt))) for alt in av[1]]
+            if all(alternatives):
+                clauses.append(frozenset().union(*alternatives))
+                run.clear()
+        flush()
+        if op is sre_constants.SUBPATTERN:
+            clauses.extend(_requirements(av[-1]))
+        elif op in _REPEATS and av[0] >= 1:
+            item = av[2]
+            if len(item) == 1 and item[0][0] is sre_constants.LITERAL and item[0][1] < 128:
+                # A repeated character such as ``#{3,}`` requires its minimum run.
+                run.extend(chr(item[0][1]).lower() * av[0])
+                flush()
+            else:
+                clauses.extend(_requirements(item))
+    flush()
+    return clauses
+
+
+def required_literals(pattern: re.Pattern) -> list[frozenset[str]]:
+    """Return the literal clauses every match of ``pattern`` must satisfy.
+
+    Each clause is a set of case-folded literals of which at least one occurs
+    in the matched text. An empty list means the pattern cannot be filtered
+    and must be verified against every prompt.
+    """
+    clauses = _requirements(sre_parse.parse(pattern.pattern, pattern.flags))
+    return list(dict.fromkeys(clauses))
+
+
+def _max_width(subpattern, run_chars: int) -> int:
+    width = 0
+    for op, av in subpattern:
+        if op in (sre_constants.LITERAL, sre_constants.NOT_LITERAL, sre_constants.ANY,
+                  sre_constants.IN):
+            width += 1
+        elif op is sre_constants.SUBPATTERN:
+            width += _max_width(av[-1], run_chars)
+        elif op is sre_constants.ATOMIC_GROUP:
+            width += _max_width(av, run_chars)
+        elif op is sre_constants.BRANCH:
+            width += max(_max_width(alt, run_chars) for alt in av[1])
+        elif op in _REPEATS:
+            item = _max_width(av[2], run_chars)
+            if av[1] == sre_constants.MAXREPEAT:
+                width += max(av[0] * item, run_chars)
+            else:
+                width += av[1] * item
+    return width
+
+
+def max_match_chars(pattern: re.Pattern, run_chars: int) -> int:
+    """Length of the longest match of ``pattern`` whose unbounded runs are ``run_chars`` or less.
+
+    Unbounded repeats (``\\s+``, ``.*``) make the true maximum infinite, so
+    each is assumed to span at most ``run_chars`` characters.
+    """
+    return _max_width(sre_parse.parse(pattern.pattern, pattern.flags), run_chars)
+
+
+def search_slices(
+    pattern: re.Pattern,
+    text: str,
+    slice_chars: int,
+    overlap: int,
+    exhausted: Callable[[], bool] | None = None,
+) -> tuple[re.Match | None, bool]:
+    """First match of ``pattern`` over slices of ``text`` overlapping by ``overlap``.
+
+    Bounds a polynomially backtracking search by the slice length rather
+    than the text length. ``exhausted`` is polled between slices; returns
+    (match or None, whether the whole text was searched).
+    """
+    slice_chars = max(slice_chars, 2 * overlap)
+    start = 0
+    while True:
+        end = start + slice_chars
+        # Searching from ``start`` rather than slicing keeps lookbehinds and
+        # anchors seeing the text before the slice
+        match = pattern.search(text, start, end)
+        if end >= len(text) or (match and match.end() < end):
+            return match, True
+        if match and match.start() > start:
+            # ``$``, ``\b`` and lookaheads also match at a slice's artificial end,
+            # so a match touching it is only kept once it ends inside a slice:
+            # search again with a slice that starts where it does
+            start = match.start()
+        else:
+            start += slice_chars - overlap
+        if exhausted is not None and exhausted():
+            return None, False
+
+
+class PatternSet:
+    """A group of injection patterns scanned together in a single pass."""
+
+    def __init__(self, patterns: list[InjectionPattern]):
+        self.patterns = list(patterns)
+        self.requirements = [required_literals(p.pattern) for p in self.patterns]
+        self._always = [i for i, clauses in enumerate(self.requirements) if not clauses]
+
+        self._by_literal: dict[str, list[int]] = {}
+        for index, clauses in enumerate(self.requirements):
+            for literal in frozenset().union(*clauses):
+                self._by_literal.setdefault(literal, []).append(index)
+
+        self._index = AhoCorasick(self._by_literal)
+
+        guarded = set()
+        for index, pattern in enumerate(self.patterns):
+            findings = analyze(pattern.pattern)
+            for finding in findings:
+                if finding.severity == EXPONENTIAL:
+                    raise ValueError(
+                        f"pattern {pattern.name!r} can backtrack exponentially: {finding.reason}"
+                    )
+            if findings:
+                guarded.add(index)
+                # Debug: the library's own guarded patterns are expected, and info
+                # lines would land in `detector scan` output written to stdout
+                get_logger("detector.patterns").debug(
+                    "Guarding pattern %s: %s",
+                    pattern.name, "; ".join(finding.reason for finding in findings),
+                )
+        self.guarded = frozenset(guarded)
+        # How far consecutive slices of a guarded pattern's search overlap
+        self._guard_overlap = {
+            index: max_match_chars(self.patterns[index].pattern, RUN_CHARS) for index in guarded
+        }
+
+    def max_match_chars(self, run_chars: int) -> int:
+        """Longest match of any pattern in the set; see ``max_match_chars``."""
+        return max((max_match_chars(p.pattern, run_chars) for p in self.patterns), default=0)
+
+    def candidates(self, text: str, folded: str | None = None) -> list[int]:
+        """Indices of patterns that may match ``text``, in library order.
+
+        ``folded`` is ``fold_case(text)``, for callers that have it already.
+        """
+        found = self._index.find(fold_case(text) if folded is None else folded)
+        selected = set(self._always)
+        for index in {i for literal in found for i in self._by_literal[literal]}:
+            if all(not clause.isdisjoint(found) for clause in self.requirements[index]):
+                selected.add(index)
+        return sorted(selected)
+
+    def scan(self, text: str, folded: str | None = None) -> list[InjectionPattern]:
+        """Return every pattern that matches ``text``, in library order."""
+        return [pattern for pattern, _ in self.scan_within(text, folded)[0]]
+
+    def scan_within(
+        self,
+        text: str,
+        folded: str | None = None,
+        budget_seconds: float | None = None,
+        guarded_max_chars: int | None = None,
+    ) -> tuple[list[tuple[InjectionPattern, re.Match]], list[InjectionPattern]]:
+        """Scan ``text`` under limits; returns (matches, skipped patterns) in library order.
+
+        Each match pairs a pattern with its first ``re.Match`` in ``text``.
+        ``re`` can't interrupt a search, so the budget is checked between
+        patterns and between slices: once ``budget_seconds`` have passed, the
+        candidates not yet fully searched are skipped. Patterns are searched
+        most confident first. Guarded patterns go last, and search ``text`` in
+        slices of ``guarded_max_chars`` characters, which bounds the cost of
+        each search. Slices overlap by the pattern's longest match with runs
+        of up to ``RUN_CHARS``, so such a match is never cut in two.
+        """
+        started = time.perf_counter()
+
+        def exhausted() -> bool:
+            return budget_seconds is not None and time.perf_counter() - started > budget_seconds
+
+        # Unguarded patterns first, most confident first, so padding that
+        # exhausts the budget can't starve the cheap, decisive checks
+        ordered = sorted(
+            self.candidates(text, folded),
+            key=lambda i: (i in self.guarded, -self.patterns[i].confidence),
+        )
+        matches: dict[int, re.Match] = {}
+        skipped: list[int] = []
+        for position, index in enumerate(ordered):
+            if exhausted():
+                skipped = ordered[position:]
+                break
+            pattern = self.patterns[index].pattern
+            if guarded_max_chars is None or index not in self.guarded:
+                match = pattern.search(text)
+            else:
+                match, finished = search_slices(
+                    pattern, text, guarded_max_chars, self._guard_overlap[index], exhausted
+                )
+                if not finished:
+                    skipped = ordered[position:]
+                    break
+            if match:
+                matches[index] = match
+        return (
+            [(self.patterns[i], matches[i]) for i in sorted(matches)],
+            [self.patterns[i] for i in sorted(skipped)],
+        )
+
@@ -0,0 +1,237 @@
+"""Static check of regexes for catastrophic-backtracking shapes.
+
+Python's ``re`` is a backtracking engine with no timeout, so a pattern of
+the wrong shape lets a crafted prompt pin a worker for seconds or longer.
+``analyze`` walks a compiled pattern's parse tree (like
+``pattern_set.required_literals``) and reports the shapes known to blow up:
+
+- exponential: an unbounded repeat nested inside another, as in ``(a+)+``.
+  Matching time doubles with every extra character.
+- polynomial: an unbounded run that a failed match re-scans from many
+  positions. These are an adjacent pair of repeats that can match the same
+  characters (``\\s+.*``), an any-character run with more pattern after it
+  (``.*foo``), and a run the pattern starts with (``#{3,}``), which a
+  search re-enters at every position inside a long run of that character.
+
+The check is conservative: it approximates character classes over a sample
+alphabet and may miss shapes, but everything it flags can be made slow.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from re import _constants as sre_constants
+from re import _parser as sre_parse
+
+EXPONENTIAL = "exponential"
+POLYNOMIAL = "polynomial"
+
+# Characters used to approximate what a class matches: ASCII plus a few
+# non-ASCII stand-ins for letters, spaces and symbols.
+_ALPHABET = tuple(chr(code) for code in range(128)) + ("é", "ſ", "\xa0", " ", "中")
+
+_CATEGORIES = {
+    sre_constants.CATEGORY_DIGIT: re.compile(r"\d"),
+    sre_constants.CATEGORY_NOT_DIGIT: re.compile(r"\D"),
+    sre_constants.CATEGORY_SPACE: re.compile(r"\s"),
+    sre_constants.CATEGORY_NOT_SPACE: re.compile(r"\S"),
+    sre_constants.CATEGORY_WORD: re.compile(r"\w"),
+    sre_constants.CATEGORY_NOT_WORD: re.compile(r"\W"),
+}
+
+_BACKTRACKING_REPEATS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT)
+_REPEATS = _BACKTRACKING_REPEATS + (sre_constants.POSSESSIVE_REPEAT,)
+_ZERO_WIDTH = (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT)
+
+
+@dataclass(frozen=True)
+class Finding:
+    severity: str
+    reason: str
+
+
+def _variants(char: str, ignorecase: bool) -> set[str]:
+    return {char, char.lower(), char.upper()} if ignorecase else {char}
+
+
+def _class_matches(items, char: str) -> bool:
+    negate = False
+    matched = False
+    for op, av in items:
+        if op is sre_constants.NEGATE:
+            negate = True
+        elif op is sre_constants.LITERAL:
+            matched |= char == chr(av)
+        elif op is sre_constants.RANGE:
+            matched |= av[0] <= ord(char) <= av[1]
+        elif op is sre_constants.CATEGORY:
+            matched |= bool(_CATEGORIES[av].match(char))
+    return matched != negate
+
+
+def _char_set(op, av, flags: int) -> frozenset[str]:
+    """The sample characters a single-character node matches."""
+    ignorecase = bool(flags & re.IGNORECASE)
+    if op is sre_constants.ANY:
+        return frozenset(c for c in _ALPHABET if flags & re.DOTALL or c != "\n")
+    if op is sre_constants.LITERAL:
+        return frozenset(c for c in _ALPHABET if chr(av) in _variants(c, ignorecase))
+    if op is sre_constants.NOT_LITERAL:
+        return frozenset(c for c in _ALPHABET if chr(av) not in _variants(c, ignorecase))
+    if op is sre_constants.IN:
+        return frozenset(
+            c for c in _ALPHABET if any(_class_matches(av, v) for v in _variants(c, ignorecase))
+        )
+    return frozenset()
+
+
+def _children(op, av) -> list:
+    """The sub-sequences nested directly inside a node."""
+    if op is sre_constants.SUBPATTERN:
+        return [av[-1]]
+    if op is sre_constants.BRANCH:
+        return list(av[1])
+    if op in _REPEATS:
+        return [av[2]]
+    if op is sre_constants.ATOMIC_GROUP:
+        return [av]
+    if op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+        return [av[1]]
+    return []
+
+
+def _chars(seq, flags: int) -> frozenset[str]:
+    """Every sample character any part of ``seq`` can consume."""
+    chars: frozenset[str] = frozenset()
+    for op, av in seq:
+        if op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            continue
+        chars |= _char_set(op, av, flags)
+        for child in _children(op, av):
+            chars |= _chars(child, flags)
+    return chars
+
+
+def _nullable(seq) -> bool:
+    """Whether ``seq`` can match without consuming a character."""
+    for op, av in seq:
+        if op in _ZERO_WIDTH:
+            continue
+        if op in _REPEATS:
+            if av[0] == 0 or _nullable(av[2]):
+                continue
+        elif op is sre_constants.SUBPATTERN or op is sre_constants.ATOMIC_GROUP:
+            if _nullable(_children(op, av)[0]):
+                continue
+        elif op is sre_constants.BRANCH:
+            if any(_nullable(alt) for alt in av[1]):
+                continue
+        return False
+    return True
+
+
+def _first(seq, flags: int, after: frozenset[str]) -> frozenset[str]:
+    """Sample characters ``seq`` can start with; ``after`` is what may follow it."""
+    chars: frozenset[str] = frozenset()
+    for op, av in seq:
+        if op in _ZERO_WIDTH:
+            continue
+        chars |= _char_set(op, av, flags)
+        for child in _children(op, av):
+            chars |= _first(child, flags, frozenset())
+        if not _nullable([(op, av)]):
+            return chars
+    return chars | after
+
+
+def _unbounded(op, av) -> bool:
+    return op in _REPEATS and av[1] == sre_constants.MAXREPEAT
+
+
+def _has_unbounded(seq) -> bool:
+    for op, av in seq:
+        # Lookarounds don't repeat, and an atomic group never gives back what it matched
+        if op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT, sre_constants.ATOMIC_GROUP):
+            continue
+        if (op in _BACKTRACKING_REPEATS and av[1] == sre_constants.MAXREPEAT) or any(
+            _has_unbounded(child) for child in _children(op, av)
+        ):
+            return True
+    return False
+
+
+def _leading_repeat(seq):
+    """The unbounded repeat ``seq`` starts with, unless an anchor or lookbehind guards it."""
+    for op, av in seq:
+        if op in _ZERO_WIDTH:
+            return None
+        if _unbounded(op, av):
+            return av
+        if op is sre_constants.SUBPATTERN:
+            return _leading_repeat(av[-1])
+        return None
+    return None
+
+
+def _tempered(body, seq, index: int) -> bool:
+    """Whether repeat ``seq[index]`` is ``DELIM(?:(?!DELIM).)*``.
+
+    Runs that start after a delimiter and stop at the next one never
+    overlap, so the pattern scans each character once.
+    """
+    if len(body) != 1 or body[0][0] is not sre_constants.SUBPATTERN:
+        body = [(sre_constants.SUBPATTERN, (None, 0, 0, body))]
+    inner = body[0][1][-1]
+    if len(inner) != 2 or inner[0][0] is not sre_constants.ASSERT_NOT:
+        return False
+    direction, delimiter = inner[0][1]
+    if direction != 1 or any(op is not sre_constants.LITERAL for op, _ in delimiter):
+        return False
+    before = seq[index - len(delimiter):index] if index >= len(delimiter) else None
+    return list(before or ()) == list(delimiter)
+
+
+def _walk(seq, flags: int, after: frozenset[str], findings: list[Finding]) -> None:
+    for index, (op, av) in enumerate(seq):
+        rest = seq[index + 1:]
+        follow = _first(rest, flags, after)
+
+        if op in _BACKTRACKING_REPEATS and av[1] == sre_constants.MAXREPEAT:
+            body = av[2]
+            run = _chars(body, flags)
+            if _has_unbounded(body):
+                findings.append(Finding(EXPONENTIAL, "nested unbounded repeats"))
+            elif follow and len(run) >= len(_ALPHABET) - 1 and not _tempered(body, seq, index):
+                findings.append(
+                    Finding(POLYNOMIAL, "unbounded any-character run followed by more pattern")
+                )
+            else:
+                following = [(o, a) for o, a in rest if o not in _ZERO_WIDTH][:1]
+                while following and following[0][0] is sre_constants.SUBPATTERN:
+                    following = following[0][1][-1][:1]
+                if following and _unbounded(*following[0]):
+                    if run & _chars(following[0][1][2], flags):
+                        findings.append(
+                            Finding(POLYNOMIAL, "adjacent unbounded repeats share characters")
+                        )
+
+        for child in _children(op, av):
+            child_after = frozenset() if op in _ZERO_WIDTH else follow
+            if op in _REPEATS:
+                # A repeated body may be followed by another iteration of itself
+                child_after = child_after | _first(child, flags, frozenset())
+            _walk(child, flags, child_after, findings)
+
+
+def analyze(pattern: re.Pattern) -> list[Finding]:
+    """Return the catastrophic-backtracking shapes found in ``pattern``."""
+    parsed = sre_parse.parse(pattern.pattern, pattern.flags)
+    flags = parsed.state.flags
+    findings: list[Finding] = []
+    _walk(list(parsed), flags, frozenset(), findings)
+    if _leading_repeat(list(parsed)) is not None:
+        findings.append(
+            Finding(POLYNOMIAL, "starts with an unbounded run without a lookbehind guard")
+        )
+    return list(dict.fromkeys(findings))
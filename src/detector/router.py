@@ -2,79 +2,195 @@
 
 from __future__ import annotations
 
+import asyncio
 import time
 
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 
-from detector import __version__
-from detector.engine.ensemble import EnsembleDetector
+from detector import __version__, metrics, services
 from detector.logging_.schemas import AnalysisLogEvent
-from detector.logging_.structured_logger import log_analysis
+from detector.logging_.structured_logger import AsyncJSONHandler, get_handler, log_analysis
 from detector.models import (
     AnalysisRequest,
     AnalysisResponse,
+    BatchAnalysisRequest,
+    BatchAnalysisResponse,
+    CacheStats,
+    ExecutorStats,
     HealthResponse,
+    LogStats,
+    ModelReloadResponse,
+    ReadyResponse,
     StatsResponse,
+    StoreStats,
 )
-from detector.storage.sqlite_store import AnalysisStore
-from detector.config import settings
 
 router = APIRouter()
-ensemble = EnsembleDetector()
-store = AnalysisStore(settings.db_path)
 
+# /stats serves possibly stale counts rather than wait longer on a stalled store
+STATS_FLUSH_TIMEOUT_SECONDS = 2.0
 
-@router.post("/analyze", response_model=AnalysisResponse)
-async def analyze_prompt(request: AnalysisRequest, req: Request) -> AnalysisResponse:
-    start = time.perf_counter()
-
-    result = ensemble.analyze(request.prompt)
-
-    latency_ms = (time.perf_counter() - start) * 1000
 
-    # Persist to storage
+def _store_row(prompt: str, result: AnalysisResponse, latency_ms: float) -> dict:
     triggered_names = [d.detector_name for d in result.triggered_detectors if d.triggered]
-    store.save(
-        prompt_hash=result.prompt_hash,
-        prompt_length=len(request.prompt),
-        verdict=result.verdict.value,
-        confidence=result.confidence,
-        primary_category=result.primary_category.value,
-        triggered_detectors=",".join(triggered_names),
-        explanation=result.explanation,
-        latency_ms=latency_ms,
-    )
-
-    # Structured logging
+    return {
+        "prompt_hash": result.prompt_hash,
+        "prompt_length": len(prompt),
+        "verdict": result.verdict.value,
+        "confidence": result.confidence,
+        "primary_category": result.primary_category.value,
+        "triggered_detectors": ",".join(triggered_names),
+        "explanation": result.explanation,
+        "latency_ms": latency_ms,
+    }
+
+
+def _observe(prompts: list[str], results: list[AnalysisResponse], latency_ms: float) -> None:
+    for prompt, result in zip(prompts, results):
+        metrics.ANALYSES.inc(result.verdict.value)
+        metrics.PROMPT_LENGTH.observe(len(prompt))
+    metrics.ANALYSIS_LATENCY.observe(latency_ms / 1000, count=len(prompts))
+
+
+def _persist(svc: services.Services, rows: list[dict]) -> None:
+    if svc.writer is None:
+        svc.store.save_many(rows)
+    elif len(rows) == 1:
+        svc.writer.submit(rows[0])
+    else:
+        # One queue entry, so the batch is written in one transaction or dropped whole
+        svc.writer.submit_many(rows)
+
+
+def _log_result(prompt: str, result: AnalysisResponse, latency_ms: float, req: Request) -> None:
     client_ip = req.client.host if req.client else ""
     event = AnalysisLogEvent.from_analysis(
         prompt_hash=result.prompt_hash,
-        prompt_length=len(request.prompt),
+        prompt_length=len(prompt),
         verdict=result.verdict.value,
         confidence=result.confidence,
         primary_category=result.primary_category.value,
-        triggered_detectors=triggered_names,
+        triggered_detectors=[d.detector_name for d in result.triggered_detectors if d.triggered],
         detector_confidences={
             d.detector_name: d.confidence for d in result.triggered_detectors
         },
         latency_ms=latency_ms,
         source_ip=client_ip,
+        model_version=result.model_version,
     )
     log_analysis(event)
 
+
+@router.post("/analyze", response_model=AnalysisResponse)
+async def analyze_prompt(request: AnalysisRequest, req: Request) -> AnalysisResponse:
+    start = time.perf_counter()
+
+    svc = await services.aget()
+    result = await svc.executor.analyze(request.prompt)
+
+    latency_ms = (time.perf_counter() - start) * 1000
+    _observe([request.prompt], [result], latency_ms)
+
+    # Persist to storage
+    _persist(svc, [_store_row(request.prompt, result, latency_ms)])
+
+    # Structured logging
+    _log_result(request.prompt, result, latency_ms, req)
+
     return result
 
 
+@router.post("/analyze/batch", response_model=BatchAnalysisResponse)
+async def analyze_batch(request: BatchAnalysisRequest, req: Request) -> BatchAnalysisResponse:
+    start = time.perf_counter()
+
+    prompts = [item.prompt for item in request.items]
+    svc = await services.aget()
+    results = await svc.executor.analyze_batch(prompts)
+
+    # Batch latency is amortised evenly across its items
+    latency_ms = (time.perf_counter() - start) * 1000 / len(prompts)
+    _observe(prompts, results, latency_ms)
+
+    _persist(svc, [
+        _store_row(prompt, result, latency_ms) for prompt, result in zip(prompts, results)
+    ])
+
+    for prompt, result in zip(prompts, results):
+        _log_result(prompt, result, latency_ms, req)
+
+    return BatchAnalysisResponse(results=results)
+
+
 @router.get("/health", response_model=HealthResponse)
 async def health() -> HealthResponse:
+    """Liveness probe: always ``healthy``, answered without waiting for startup.
+
+    ``startup`` is starting, ready or failed; statistics are included once
+    the services are built. ``cache`` is omitted with the process executor,
+    whose workers each keep a cache this process can't see.
+    """
+    svc = services.current()
+    log_handler = get_handler()
+    built = {}
+    if svc is not None:
+        built = {
+            "detectors_loaded": svc.ensemble.loaded_detectors,
+            "model_version": svc.ensemble.ml.model_version,
+            "cache": (
+                CacheStats(**svc.ensemble.cache.stats()) if svc.executor.mode != "process" else None
+            ),
+            "store": StoreStats(**svc.writer.stats()) if svc.writer is not None else None,
+            "executor": ExecutorStats(**svc.executor.stats()),
+        }
     return HealthResponse(
         status="healthy",
         version=__version__,
-        detectors_loaded=ensemble.loaded_detectors,
+        startup=services.status(),
+        log=LogStats(**log_handler.stats()) if isinstance(log_handler, AsyncJSONHandler) else None,
+        **built,
     )
 
 
+@router.get("/ready", response_model=ReadyResponse, responses={503: {"model": ReadyResponse}})
+async def readiness():
+    """Readiness probe: 503 until startup has loaded and warmed up every detector."""
+    body = ReadyResponse(ready=services.ready, startup_ms=services.startup_ms)
+    if not services.ready:
+        return JSONResponse(body.model_dump(), status_code=503)
+    return body
+
+
 @router.get("/stats", response_model=StatsResponse)
 async def stats() -> StatsResponse:
-    data = store.get_stats()
+    svc = await services.aget()
+    # Read-your-writes: include rows still sitting in the write-behind queue,
+    # waiting off the event loop and for at most STATS_FLUSH_TIMEOUT_SECONDS
+    if svc.writer is not None:
+        await asyncio.to_thread(svc.writer.flush, STATS_FLUSH_TIMEOUT_SECONDS)
+    data = svc.store.get_stats()
     return StatsResponse(**data)
+
+
+@router.post("/admin/reload-model", response_model=ModelReloadResponse)
+async def reload_model_endpoint() -> ModelReloadResponse:
+    """Load, validate and swap in the model artifacts on disk without a restart."""
+    from detector.engine.ml_detector import ModelReloadError
+
+    svc = await services.aget()
+    try:
+        # Off the event loop: requests keep being served by the current model meanwhile
+        version, previous = await asyncio.to_thread(svc.reload_model)
+    except ModelReloadError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    return ModelReloadResponse(model_version=version, previous_version=previous)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint() -> PlainTextResponse:
+    # Cache, executor and store gauges are registered once the services exist
+    await services.aget()
+    return PlainTextResponse(
+        metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
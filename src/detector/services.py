@@ -0,0 +1,289 @@
+"""The detector, executor and store an API process serves requests with.
+
+Nothing heavy happens at import: ``start`` (called from the app lifespan)
+imports the engine, compiles the pattern library, loads the model, opens
+the database and warms everything up in a background thread, recording
+how long each step took. Requests arriving earlier wait for it without
+blocking the event loop; ``/ready`` reports when it has finished. A failed
+startup is kept and re-raised to later callers rather than retried.
+
+Under a pre-forking server (see ``detector.gunicorn_conf``) the master
+calls ``preload`` to build the detectors once, and every forked worker
+reuses them instead of loading its own.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gc
+import threading
+import time
+from contextlib import contextmanager
+
+from detector import metrics
+from detector.config import settings
+from detector.logging_.structured_logger import AsyncJSONHandler, get_handler, get_logger
+
+
+class StartupError(RuntimeError):
+    """Building the services failed; raised to every caller after the first."""
+
+
+class Services:
+    """Everything request handlers need, built once per process."""
+
+    def __init__(self, ensemble, executor, store, writer, watcher):
+        self.ensemble = ensemble
+        self.executor = executor
+        self.store = store
+        self.writer = writer
+        self.watcher = watcher
+        self._reload_lock = threading.Lock()
+
+    def reload_model(self) -> tuple[str, str]:
+        """Swap in the model currently on disk; returns (new, previous) versions.
+
+        Raises ``ModelReloadError`` and keeps serving the current model if the
+        new artifacts fail to load or validate.
+        """
+        with self._reload_lock:
+            previous = self.ensemble.ml.model_version
+            version = self.ensemble.ml.reload()
+            # Process-mode workers hold their own ensembles; replace them so they load it too
+            self.executor.recycle()
+        get_logger("detector.model").info("Model version %s replaced %s", version, previous)
+        return version, previous
+
+    def close(self) -> None:
+        if self.watcher is not None:
+            self.watcher.close()
+        self.executor.shutdown()
+        # Flush analyses still queued for the database before the worker exits
+        if self.writer is not None:
+            self.writer.close()
+
+
+_services: Services | None = None
+# Ensemble built by ``preload`` in a pre-fork master, inherited by its workers
+_preloaded = None
+_build_lock = threading.Lock()
+# Milliseconds per startup phase, filled in as they complete
+startup_ms: dict[str, float] = {}
+ready = False
+# Why startup failed, if it did
+failure: BaseException | None = None
+
+
+@contextmanager
+def _phase(name: str):
+    started = time.perf_counter()
+    yield
+    startup_ms[name] = round((time.perf_counter() - started) * 1000, 1)
+
+
+def _ensemble():
+    with _phase("import"):
+        from detector.engine.ensemble import EnsembleDetector
+        from detector.engine.heuristic_detector import HeuristicDetector
+        from detector.engine.ml_detector import MLDetector
+        from detector.engine.regex_detector import RegexDetector
+
+    with _phase("patterns"):
+        regex = RegexDetector()
+        heuristic = HeuristicDetector()
+
+    with _phase("model"):
+        ml = MLDetector()
+
+    return EnsembleDetector(regex, heuristic, ml)
+
+
+def _build() -> Services:
+    ensemble = _preloaded if _preloaded is not None else _ensemble()
+    from detector.engine.executor import DetectorExecutor
+    from detector.engine.ml_detector import artifact_paths
+    from detector.engine.model_watcher import ModelWatcher
+    from detector.storage.batch_writer import BatchWriter
+    from detector.storage.sqlite_store import AnalysisStore
+
+    # Threads, pools and database connections don't survive a fork, so even
+    # a preloaded worker opens its own
+    with _phase("database"):
+        store = AnalysisStore(
+            settings.db_path,
+            synchronous=settings.db_synchronous,
+            cache_size_kb=settings.db_cache_size_kb,
+        )
+        writer = (
+            BatchWriter(
+                store,
+                max_rows=settings.store_flush_rows,
+                flush_interval_ms=settings.store_flush_interval_ms,
+                max_queue=settings.store_queue_size,
+            )
+            if settings.store_write_behind
+            else None
+        )
+
+    executor = DetectorExecutor(ensemble, settings.executor, settings.executor_workers)
+    services = Services(ensemble, executor, store, writer, None)
+    if settings.model_watch_interval_seconds > 0:
+        services.watcher = ModelWatcher(
+            artifact_paths, services.reload_model, settings.model_watch_interval_seconds
+        )
+    _register_metrics(services)
+    return services
+
+
+def get() -> Services:
+    """The process's services, building them on first use if startup hasn't yet.
+
+    Raises ``StartupError`` once building has failed, instead of building again.
+    """
+    global _services, failure
+    if _services is None:
+        with _build_lock:
+            if failure is not None:
+                raise StartupError(f"startup failed: {failure!r}") from failure
+            if _services is None:
+                try:
+                    _services = _build()
+                except Exception as exc:
+                    failure = exc
+                    raise
+    return _services
+
+
+def current() -> Services | None:
+    """The process's services if they are built, without waiting or building."""
+    return _services
+
+
+def status() -> str:
+    """``ready``, ``starting`` or ``failed``, without waiting for startup."""
+    if failure is not None:
+        return "failed"
+    return "ready" if ready else "starting"
+
+
+async def aget() -> Services:
+    """``get`` for request handlers: waits for startup off the event loop."""
+    if _services is not None:
+        return _services
+    return await asyncio.to_thread(get)
+
+
+def preload() -> None:
+    """Build and warm the ensemble in a pre-fork master, before it forks workers.
+
+    Workers then share its pages copy-on-write. Automatic garbage collection
+    stays off from here until ``after_fork``, and everything allocated is
+    frozen out of the collector's reach, so collections in the workers never
+    write to (and thereby copy) the shared objects.
+    """
+    global _preloaded
+    gc.disable()
+    ensemble = _ensemble()
+    with _phase("warm_up"):
+        ensemble.warm_up()
+    # Timings of the warm-up prompts would otherwise be inherited by every worker
+    metrics.DETECTOR_LATENCY.drain()
+    _preloaded = ensemble
+    gc.freeze()
+
+
+def after_fork() -> None:
+    """Re-enable garbage collection in a worker forked after ``preload``."""
+    gc.enable()
+
+
+def warm_up() -> None:
+    """Build the services, run the warm-up prompts through them, and log the timings."""
+    global ready, failure
+    started = time.perf_counter()
+    try:
+        services = get()
+        with _phase("warm_up"):
+            services.executor.warm_up()
+    except Exception as exc:
+        if failure is None:
+            failure = exc
+        get_logger("detector.startup").exception("Startup failed; /ready stays unavailable")
+        raise
+    startup_ms["total"] = round((time.perf_counter() - started) * 1000, 1)
+    ready = True
+    breakdown = ", ".join(f"{name} {ms:.1f}ms" for name, ms in startup_ms.items())
+    get_logger("detector.startup").info(
+        "Ready: %s", breakdown, extra={"event_data": {"startup_ms": dict(startup_ms)}}
+    )
+
+
+def start() -> asyncio.Task:
+    """Begin ``warm_up`` in a worker thread; the server accepts requests meanwhile."""
+    return asyncio.create_task(asyncio.to_thread(warm_up))
+
+
+async def stop(task: asyncio.Task | None = None) -> None:
+    """Wait for a pending startup, then release everything ``_build`` created."""
+    global _services, ready, failure
+    if task is not None:
+        await asyncio.gather(task, return_exceptions=True)
+    if _services is not None:
+        _services.close()
+    _services = None
+    ready = False
+    failure = None
+    startup_ms.clear()
+
+
+def _register_metrics(services: Services) -> None:
+    ensemble, executor, writer = services.ensemble, services.executor, services.writer
+    if executor.mode != "process":
+        # Process workers keep their own caches, which this process can't count
+        metrics.REGISTRY.register_callback(
+            "detector_cache_hits_total", "Verdict cache hits.", "counter",
+            lambda: ensemble.cache.hits,
+        )
+        metrics.REGISTRY.register_callback(
+            "detector_cache_misses_total", "Verdict cache misses.", "counter",
+            lambda: ensemble.cache.misses,
+        )
+        metrics.REGISTRY.register_callback(
+            "detector_cache_entries", "Verdicts currently cached.", "gauge",
+            lambda: len(ensemble.cache),
+        )
+    metrics.REGISTRY.register_callback(
+        "detector_executor_in_flight", "Analysis calls submitted to the executor and not yet done.",
+        "gauge", lambda: executor.in_flight,
+    )
+    metrics.REGISTRY.register_callback(
+        "detector_executor_queue_depth", "Analysis calls waiting for a free executor worker.",
+        "gauge", lambda: executor.queue_depth,
+    )
+    log_handler = get_handler()
+    if isinstance(log_handler, AsyncJSONHandler):
+        metrics.REGISTRY.register_callback(
+            "detector_log_queue_depth", "Log records waiting for the background log writer.",
+            "gauge", lambda: log_handler.stats()["backlog"],
+        )
+        metrics.REGISTRY.register_callback(
+            "detector_log_written_total", "Log records written by the background log writer.",
+            "counter", lambda: log_handler.stats()["written"],
+        )
+        metrics.REGISTRY.register_callback(
+            "detector_log_dropped_total", "Log records dropped because the log buffer was full.",
+            "counter", lambda: log_handler.stats()["dropped"],
+        )
+    if writer is not None:
+        metrics.REGISTRY.register_callback(
+            "detector_store_queue_depth", "Analysis rows waiting for the background writer.",
+            "gauge", lambda: writer.stats()["backlog"],
+        )
+        metrics.REGISTRY.register_callback(
+            "detector_store_written_total", "Analysis rows written by the background writer.",
+            "counter", lambda: writer.stats()["written"],
+        )
+        metrics.REGISTRY.register_callback(
+            "detector_store_dropped_total", "Analysis rows dropped by the background writer.",
+            "counter", lambda: writer.stats()["dropped"],
+        )
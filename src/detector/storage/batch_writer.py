@@ -0,0 +1,160 @@
+"""Write-behind queue that batches analysis rows into the SQLite store."""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+
+from detector.logging_.structured_logger import get_logger
+from detector.storage.sqlite_store import AnalysisStore
+
+_STOP = object()
+
+
+class BatchWriter:
+    """Accumulates rows in memory and flushes them with one ``executemany``.
+
+    A background thread writes whenever ``max_rows`` rows are buffered or the
+    oldest buffered row is ``flush_interval_ms`` old. The queue holds at most
+    ``max_queue`` entries, a row or a ``submit_many`` batch each; when it is
+    full new rows are dropped and counted rather than blocking the request
+    path.
+    """
+
+    def __init__(
+        self,
+        store: AnalysisStore,
+        max_rows: int = 100,
+        flush_interval_ms: float = 50.0,
+        max_queue: int = 10_000,
+    ):
+        self.store = store
+        self.max_rows = max_rows
+        self.flush_interval = flush_interval_ms / 1000
+        self.written = 0
+        self.dropped = 0
+        self._pending = 0
+        self._closed = False
+        self._counter_lock = threading.Lock()
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="analysis-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, row: dict) -> bool:
+        """Queue a row (keyword arguments of ``AnalysisStore.save``). False if dropped."""
+        row.setdefault("timestamp", datetime.now(timezone.utc).isoformat())
+        # Checked and enqueued under the lock, so no row lands behind close()'s stop marker
+        with self._counter_lock:
+            try:
+                if self._closed:
+                    raise queue.Full
+                self._queue.put_nowait(row)
+            except queue.Full:
+                self.dropped += 1
+                return False
+            self._pending += 1
+        return True
+
+    def submit_many(self, rows: list[dict]) -> bool:
+        """Queue rows to be written together in one transaction. False if all were dropped.
+
+        The rows take a single queue entry, so they are kept or dropped as a whole.
+        """
+        if not rows:
+            return True
+        timestamp = datetime.now(timezone.utc).isoformat()
+        for row in rows:
+            row.setdefault("timestamp", timestamp)
+        with self._counter_lock:
+            try:
+                if self._closed:
+                    raise queue.Full
+                self._queue.put_nowait(list(rows))
+            except queue.Full:
+                self.dropped += len(rows)
+                return False
+            self._pending += len(rows)
+        return True
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Block until every row submitted so far has been written.
+
+        Returns False if that took longer than ``timeout`` seconds.
+        """
+        if not self._thread.is_alive():
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(None if deadline is None else max(deadline - time.monotonic(), 0.0))
+
+    def close(self, timeout: float | None = 5.0) -> None:
+        """Flush outstanding rows and stop the writer thread."""
+        with self._counter_lock:
+            if self._closed:
+                return
+            self._closed = True
+        # Outside the lock: a full queue waits on the writer, which takes the
+        # lock after each batch. No row can follow the marker once _closed is set.
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            get_logger("detector.storage").warning("Writer queue still full, not waiting for it")
+            return
+        self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        return {
+            "backlog": self._pending,
+            "written": self.written,
+            "dropped": self.dropped,
+        }
+
+    def _run(self) -> None:
+        batch: list[dict] = []
+        deadline = 0.0
+        while True:
+            timeout = max(deadline - time.monotonic(), 0.0) if batch else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if isinstance(item, dict):
+                if not batch:
+                    deadline = time.monotonic() + self.flush_interval
+                batch.append(item)
+                if len(batch) < self.max_rows:
+                    continue
+            elif isinstance(item, list):
+                # A submit_many batch: written at once, in the same save_many as
+                # any rows already buffered, never split across transactions
+                batch.extend(item)
+
+            # Size or age limit reached, or a flush/stop request
+            self._write(batch)
+            batch = []
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is _STOP:
+                return
+
+    def _write(self, batch: list[dict]) -> None:
+        if not batch:
+            return
+        try:
+            self.store.save_many(batch)
+        except Exception:
+            get_logger("detector.storage").exception("Failed to write %d analyses", len(batch))
+            with self._counter_lock:
+                self.dropped += len(batch)
+                self._pending -= len(batch)
+            return
+        with self._counter_lock:
+            self.written += len(batch)
+            self._pending -= len(batch)
@@ -3,21 +3,154 @@
 from __future__ import annotations
 
 import sqlite3
+import threading
 from datetime import datetime, timezone
 
+_SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+# Rollup tables kept current by triggers, so stats cost O(buckets) rather than
+# a scan of every analysis. Categories are only counted for flagged verdicts.
+_ROLLUP_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS verdict_totals (
+        verdict TEXT PRIMARY KEY,
+        count INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS category_totals (
+        primary_category TEXT PRIMARY KEY,
+        count INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS hourly_verdicts (
+        hour TEXT NOT NULL,
+        verdict TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (hour, verdict)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS daily_verdicts (
+        date TEXT NOT NULL,
+        verdict TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (date, verdict)
+    )
+    """,
+]
+
+_HOUR = "strftime('%Y-%m-%dT%H:00:00', {ts})"
+_DAY = "DATE({ts})"
+_CATEGORY = "COALESCE({row}.primary_category, 'none')"
+
+_ROLLUP_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS analyses_rollup_insert AFTER INSERT ON analyses BEGIN
+        INSERT INTO verdict_totals (verdict, count) VALUES (NEW.verdict, 1)
+            ON CONFLICT (verdict) DO UPDATE SET count = count + 1;
+        INSERT INTO category_totals (primary_category, count)
+            SELECT {_CATEGORY.format(row="NEW")}, 1 WHERE NEW.verdict != 'CLEAN'
+            ON CONFLICT (primary_category) DO UPDATE SET count = count + 1;
+        INSERT INTO hourly_verdicts (hour, verdict, count)
+            VALUES ({_HOUR.format(ts="NEW.timestamp")}, NEW.verdict, 1)
+            ON CONFLICT (hour, verdict) DO UPDATE SET count = count + 1;
+        INSERT INTO daily_verdicts (date, verdict, count)
+            VALUES ({_DAY.format(ts="NEW.timestamp")}, NEW.verdict, 1)
+            ON CONFLICT (date, verdict) DO UPDATE SET count = count + 1;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS analyses_rollup_delete AFTER DELETE ON analyses BEGIN
+        UPDATE verdict_totals SET count = count - 1 WHERE verdict = OLD.verdict;
+        UPDATE category_totals SET count = count - 1
+            WHERE OLD.verdict != 'CLEAN' AND primary_category = {_CATEGORY.format(row="OLD")};
+        UPDATE hourly_verdicts SET count = count - 1
+            WHERE hour = {_HOUR.format(ts="OLD.timestamp")} AND verdict = OLD.verdict;
+        UPDATE daily_verdicts SET count = count - 1
+            WHERE date = {_DAY.format(ts="OLD.timestamp")} AND verdict = OLD.verdict;
+    END
+    """,
+]
+
+# Rebuilds every rollup from scratch; only needed when upgrading an existing database.
+_ROLLUP_BACKFILL = [
+    "DELETE FROM verdict_totals",
+    "DELETE FROM category_totals",
+    "DELETE FROM hourly_verdicts",
+    "DELETE FROM daily_verdicts",
+    "INSERT INTO verdict_totals SELECT verdict, COUNT(*) FROM analyses GROUP BY verdict",
+    f"""
+    INSERT INTO category_totals
+        SELECT {_CATEGORY.format(row="analyses")}, COUNT(*) FROM analyses
+        WHERE verdict != 'CLEAN' GROUP BY 1
+    """,
+    f"""
+    INSERT INTO hourly_verdicts
+        SELECT {_HOUR.format(ts="timestamp")}, verdict, COUNT(*) FROM analyses GROUP BY 1, 2
+    """,
+    f"""
+    INSERT INTO daily_verdicts
+        SELECT {_DAY.format(ts="timestamp")}, verdict, COUNT(*) FROM analyses GROUP BY 1, 2
+    """,
+]
+
 
 class AnalysisStore:
-    def __init__(self, db_path: str = "detector_results.db"):
+    """Analysis history in SQLite, using WAL so dashboard reads never block API writes.
+
+    Connections are kept open for the life of the store: every thread reads
+    through its own connection, and all writes go through a single shared
+    writer connection serialised by a lock.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "detector_results.db",
+        synchronous: str = "NORMAL",
+        cache_size_kb: int = 16384,
+    ):
+        if synchronous.upper() not in _SYNCHRONOUS_MODES:
+            raise ValueError(f"synchronous must be one of {sorted(_SYNCHRONOUS_MODES)}")
         self.db_path = db_path
+        self.synchronous = synchronous.upper()
+        self.cache_size_kb = cache_size_kb
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._writer = self._connect()
+        self._writer.execute("PRAGMA journal_mode=WAL")
         self._init_db()
 
     def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path)
+        # Each connection is used by one thread at a time, but close() may run elsewhere
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
         conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        conn.execute(f"PRAGMA cache_size=-{int(self.cache_size_kb)}")
+        conn.execute("PRAGMA busy_timeout=5000")
+        with self._connections_lock:
+            self._connections.append(conn)
         return conn
 
+    def _reader(self) -> sqlite3.Connection:
+        """This thread's read connection, opened on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def close(self) -> None:
+        """Close every connection opened by this store."""
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
     def _init_db(self) -> None:
-        with self._connect() as conn:
+        with self._write_lock, self._writer as conn:
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS analyses (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -39,6 +172,19 @@ class AnalysisStore:
                 CREATE INDEX IF NOT EXISTS idx_analyses_timestamp ON analyses(timestamp)
             """)
 
+            # Tables and triggers are created in one write transaction, so no row
+            # can be inserted between backfilling the rollups and installing them.
+            conn.execute("BEGIN IMMEDIATE")
+            has_triggers = conn.execute(
+                "SELECT 1 FROM sqlite_master "
+                "WHERE type = 'trigger' AND name = 'analyses_rollup_insert'"
+            ).fetchone()
+            for statement in _ROLLUP_TABLES + _ROLLUP_TRIGGERS:
+                conn.execute(statement)
+            if not has_triggers:
+                for statement in _ROLLUP_BACKFILL:
+                    conn.execute(statement)
+
     def save(
         self,
         prompt_hash: str,
@@ -50,57 +196,81 @@ class AnalysisStore:
         explanation: str,
         latency_ms: float,
     ) -> None:
-        with self._connect() as conn:
-            conn.execute(
+        self.save_many([
+            {
+                "prompt_hash": prompt_hash,
+                "prompt_length": prompt_length,
+                "verdict": verdict,
+                "confidence": confidence,
+                "primary_category": primary_category,
+                "triggered_detectors": triggered_detectors,
+                "explanation": explanation,
+                "latency_ms": latency_ms,
+            }
+        ])
+
+    def save_many(self, rows: list[dict]) -> None:
+        """Insert several analyses (keyword arguments of ``save``) in one transaction.
+
+        Rows may carry their own ISO ``timestamp``; otherwise the current time is used.
+        """
+        timestamp = datetime.now(timezone.utc).isoformat()
+        with self._write_lock, self._writer as conn:
+            conn.executemany(
                 "INSERT INTO analyses (timestamp, prompt_hash, prompt_length, verdict, confidence, primary_category, triggered_detectors, explanation, latency_ms) "
                 "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                (
-                    datetime.now(timezone.utc).isoformat(),
-                    prompt_hash,
-                    prompt_length,
-                    verdict,
-                    confidence,
-                    primary_category,
-                    triggered_detectors,
-                    explanation,
-                    latency_ms,
-                ),
+                [
+                    (
+                        row.get("timestamp", timestamp),
+                        row["prompt_hash"],
+                        row["prompt_length"],
+                        row["verdict"],
+                        row["confidence"],
+                        row["primary_category"],
+                        row["triggered_detectors"],
+                        row["explanation"],
+                        row["latency_ms"],
+                    )
+                    for row in rows
+                ],
             )
 
     def get_stats(self) -> dict:
-        with self._connect() as conn:
-            total = conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
-            clean = conn.execute("SELECT COUNT(*) FROM analyses WHERE verdict='CLEAN'").fetchone()[0]
-            suspicious = conn.execute("SELECT COUNT(*) FROM analyses WHERE verdict='SUSPICIOUS'").fetchone()[0]
-            malicious = conn.execute("SELECT COUNT(*) FROM analyses WHERE verdict='MALICIOUS'").fetchone()[0]
-
-            cat_rows = conn.execute(
-                "SELECT primary_category, COUNT(*) as cnt FROM analyses "
-                "WHERE verdict != 'CLEAN' GROUP BY primary_category ORDER BY cnt DESC"
-            ).fetchall()
-            top_categories = {row["primary_category"]: row["cnt"] for row in cat_rows}
+        conn = self._reader()
+        verdicts = dict(conn.execute("SELECT verdict, count FROM verdict_totals").fetchall())
+
+        cat_rows = conn.execute(
+            "SELECT primary_category, count FROM category_totals "
+            "WHERE count > 0 ORDER BY count DESC"
+        ).fetchall()
+        top_categories = {row["primary_category"]: row["count"] for row in cat_rows}
 
         return {
-            "total_analyzed": total,
-            "total_clean": clean,
-            "total_suspicious": suspicious,
-            "total_malicious": malicious,
+            "total_analyzed": sum(verdicts.values()),
+            "total_clean": verdicts.get("CLEAN", 0),
+            "total_suspicious": verdicts.get("SUSPICIOUS", 0),
+            "total_malicious": verdicts.get("MALICIOUS", 0),
             "top_categories": top_categories,
         }
 
     def get_recent(self, limit: int = 50) -> list[dict]:
-        with self._connect() as conn:
-            rows = conn.execute(
-                "SELECT * FROM analyses ORDER BY timestamp DESC LIMIT ?", (limit,)
-            ).fetchall()
-            return [dict(r) for r in rows]
+        rows = self._reader().execute(
+            "SELECT * FROM analyses ORDER BY timestamp DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return [dict(r) for r in rows]
 
     def get_verdict_timeseries(self, days: int = 30) -> list[dict]:
-        with self._connect() as conn:
-            rows = conn.execute(
-                "SELECT DATE(timestamp) as date, verdict, COUNT(*) as count "
-                "FROM analyses GROUP BY DATE(timestamp), verdict "
-                "ORDER BY date DESC LIMIT ?",
-                (days * 3,),
-            ).fetchall()
-            return [dict(r) for r in rows]
+        rows = self._reader().execute(
+            "SELECT date, verdict, count FROM daily_verdicts "
+            "WHERE count > 0 ORDER BY date DESC LIMIT ?",
+            (days * 3,),
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    def get_hourly_timeseries(self, hours: int = 48) -> list[dict]:
+        rows = self._reader().execute(
+            "SELECT hour, verdict, count FROM hourly_verdicts "
+            "WHERE count > 0 ORDER BY hour DESC LIMIT ?",
+            (hours * 3,),
+        ).fetchall()
+        return [dict(r) for r in rows]
@@ -0,0 +1,27 @@
+"""Tests for the Aho-Corasick literal index."""
+
+from detector.patterns.aho_corasick import AhoCorasick
+
+
+class TestAhoCorasick:
+    def test_finds_literals(self):
+        index = AhoCorasick(["ignore", "system", "base64"])
+        assert index.find("please ignore the system") == {"ignore", "system"}
+
+    def test_no_match(self):
+        index = AhoCorasick(["ignore", "system"])
+        assert index.find("what is the capital of france?") == set()
+
+    def test_overlapping_and_nested(self):
+        index = AhoCorasick(["he", "she", "hers", "his"])
+        assert index.find("ushers") == {"he", "she", "hers"}
+
+    def test_failure_transitions(self):
+        index = AhoCorasick(["abcd", "bce"])
+        assert index.find("abce") == {"bce"}
+
+    def test_matches_substring_search(self):
+        literals = ["in", "instead", "inst", "stead", "tea", "ad"]
+        index = AhoCorasick(literals)
+        text = "use this instead of that"
+        assert index.find(text) == {lit for lit in literals if lit in text}
@@ -0,0 +1,104 @@
+"""Tests for the write-behind batch writer."""
+
+import threading
+import time
+
+from detector.storage.batch_writer import BatchWriter
+from detector.storage.sqlite_store import AnalysisStore
+
+
+def _row(i: int) -> dict:
+    return {
+        "prompt_hash": f"hash-{i}",
+        "prompt_length": 10,
+        "verdict": "CLEAN",
+        "confidence": 0.0,
+        "primary_category": "none",
+        "triggered_detectors": "",
+        "explanation": "",
+        "latency_ms": 1.0,
+    }
+
+
+class BlockingStore(AnalysisStore):
+    """Store whose writes wait until released, to fill the writer's queue."""
+
+    def __init__(self, db_path: str):
+        super().__init__(db_path)
+        self.release = threading.Event()
+        self.batches: list[int] = []
+
+    def save_many(self, rows: list[dict]) -> None:
+        self.release.wait()
+        self.batches.append(len(rows))
+        super().save_many(rows)
+
+
+class TestBatchWriter:
+    def test_flush_writes_everything(self, tmp_path):
+        store = AnalysisStore(str(tmp_path / "test.db"))
+        writer = BatchWriter(store, max_rows=100, flush_interval_ms=10_000)
+        for i in range(5):
+            assert writer.submit(_row(i))
+        writer.flush()
+        assert store.get_stats()["total_analyzed"] == 5
+        assert writer.stats() == {"backlog": 0, "written": 5, "dropped": 0}
+        writer.close()
+
+    def test_batches_by_size(self, tmp_path):
+        store = BlockingStore(str(tmp_path / "test.db"))
+        store.release.set()
+        writer = BatchWriter(store, max_rows=3, flush_interval_ms=10_000)
+        for i in range(7):
+            writer.submit(_row(i))
+        writer.close()
+        assert store.batches == [3, 3, 1]
+
+    def test_drops_when_queue_full(self, tmp_path):
+        store = BlockingStore(str(tmp_path / "test.db"))
+        writer = BatchWriter(store, max_rows=1, flush_interval_ms=0, max_queue=2)
+        results = [writer.submit(_row(i)) for i in range(10)]
+        assert not all(results)
+        assert writer.stats()["dropped"] == results.count(False)
+        store.release.set()
+        writer.close()
+        assert store.get_stats()["total_analyzed"] == results.count(True)
+
+    def test_submit_many_written_in_one_transaction(self, tmp_path):
+        store = BlockingStore(str(tmp_path / "test.db"))
+        store.release.set()
+        writer = BatchWriter(store, max_rows=100, flush_interval_ms=10_000)
+        assert writer.submit_many([_row(i) for i in range(256)])
+        writer.close()
+        assert store.batches == [256]
+
+    def test_submit_many_dropped_as_a_whole(self, tmp_path):
+        store = BlockingStore(str(tmp_path / "test.db"))
+        writer = BatchWriter(store, max_rows=1, flush_interval_ms=0, max_queue=1)
+        results = [writer.submit_many([_row(i), _row(i)]) for i in range(5)]
+        assert not all(results)
+        assert writer.stats()["dropped"] == 2 * results.count(False)
+        store.release.set()
+        writer.close()
+        assert set(store.batches) == {2}
+        assert not writer.submit_many([_row(1)])
+
+    def test_flush_gives_up_after_timeout(self, tmp_path):
+        store = BlockingStore(str(tmp_path / "test.db"))
+        writer = BatchWriter(store, max_rows=1, flush_interval_ms=0, max_queue=1)
+        for i in range(3):
+            writer.submit(_row(i))
+        started = time.monotonic()
+        assert not writer.flush(timeout=0.1)
+        assert time.monotonic() - started < 1.0
+        store.release.set()
+        assert writer.flush(timeout=5.0)
+        writer.close()
+
+    def test_close_flushes_pending_rows(self, tmp_path):
+        store = AnalysisStore(str(tmp_path / "test.db"))
+        writer = BatchWriter(store, max_rows=100, flush_interval_ms=10_000)
+        writer.submit(_row(1))
+        writer.close()
+        assert store.get_stats()["total_analyzed"] == 1
+        assert not writer.submit(_row(2))
@@ -0,0 +1,37 @@
+"""Tests for the verdict cache."""
+
+import time
+
+from detector.engine.cache import VerdictCache
+
+
+class TestVerdictCache:
+    def test_hit_and_miss(self):
+        cache = VerdictCache(max_size=10)
+        assert cache.get("a") is None
+        cache.put("a", 1)
+        assert cache.get("a") == 1
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+    def test_lru_eviction(self):
+        cache = VerdictCache(max_size=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_ttl_expiry(self):
+        cache = VerdictCache(max_size=10, ttl_seconds=0.01)
+        cache.put("a", 1)
+        time.sleep(0.02)
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_disabled(self):
+        cache = VerdictCache(max_size=0)
+        cache.put("a", 1)
+        assert cache.get("a") is None
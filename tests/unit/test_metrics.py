@@ -0,0 +1,59 @@
+"""Tests for the metrics registry."""
+
+import threading
+
+from detector.metrics import MetricsRegistry
+
+
+class TestMetricsRegistry:
+    def test_counter_by_label(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("requests_total", "Requests.", ("verdict",))
+        counter.inc("CLEAN")
+        counter.inc("CLEAN")
+        counter.inc("MALICIOUS", amount=3)
+        assert counter.value("CLEAN") == 2
+        body = registry.render()
+        assert "# TYPE requests_total counter" in body
+        assert 'requests_total{verdict="CLEAN"} 2' in body
+        assert 'requests_total{verdict="MALICIOUS"} 3' in body
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+        histogram.observe(0.05)
+        histogram.observe(0.5, count=2)
+        histogram.observe(5.0)
+        lines = registry.render().splitlines()
+        assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+        assert 'latency_seconds_bucket{le="1"} 3' in lines
+        assert 'latency_seconds_bucket{le="+Inf"} 4' in lines
+        assert "latency_seconds_count 4" in lines
+        assert "latency_seconds_sum 6.05" in lines
+
+    def test_counts_from_many_threads_are_summed(self):
+        counter = MetricsRegistry().counter("hits_total", "Hits.")
+
+        def work():
+            for _ in range(1000):
+                counter.inc()
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert counter.value() == 8000
+
+    def test_drain_and_merge_move_observations(self):
+        source = MetricsRegistry().histogram("t", "T.", ("detector",), buckets=(1.0,))
+        target = MetricsRegistry().histogram("t", "T.", ("detector",), buckets=(1.0,))
+        source.observe(0.5, "regex", count=3)
+        target.merge(source.drain())
+        assert source.count("regex") == 0
+        assert target.count("regex") == 3
+
+    def test_callback(self):
+        registry = MetricsRegistry()
+        registry.register_callback("queue_depth", "Queue depth.", "gauge", lambda: 7)
+        assert "queue_depth 7" in registry.render()
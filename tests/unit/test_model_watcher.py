@@ -0,0 +1,70 @@
+"""Tests for the model artifact watcher."""
+
+import os
+
+from detector.engine.model_watcher import ModelWatcher
+
+
+def _touch(path, content: str, mtime_ns: int) -> None:
+    path.write_text(content)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+class TestModelWatcher:
+    def test_reloads_once_change_has_settled(self, tmp_path):
+        artifact = tmp_path / "coef.npy"
+        _touch(artifact, "v1", 1_000_000_000)
+        reloads = []
+        watcher = ModelWatcher(lambda: [artifact], lambda: reloads.append(1), start=False)
+
+        assert not watcher.check()
+        _touch(artifact, "v2", 2_000_000_000)
+        # First poll only notices the change; the next one, if nothing moved, reloads
+        assert not watcher.check()
+        assert watcher.check()
+        assert not watcher.check()
+        assert reloads == [1] and watcher.reloads == 1
+
+    def test_failed_reload_waits_for_next_change(self, tmp_path):
+        artifact = tmp_path / "coef.npy"
+        _touch(artifact, "v1", 1_000_000_000)
+
+        def reject():
+            raise ValueError("bad model")
+
+        watcher = ModelWatcher(lambda: [artifact], reject, start=False)
+        _touch(artifact, "v2", 2_000_000_000)
+        watcher.check()
+        assert not watcher.check()
+        assert not watcher.check()
+        assert watcher.failures == 1
+
+    def test_new_and_removed_files_count_as_changes(self, tmp_path):
+        artifact = tmp_path / "meta.json"
+        reloads = []
+        watcher = ModelWatcher(lambda: [artifact], lambda: reloads.append(1), start=False)
+        artifact.write_text("{}")
+        watcher.check()
+        assert watcher.check()
+        artifact.unlink()
+        watcher.check()
+        assert watcher.check()
+        assert len(reloads) == 2
+
+    def test_replaced_file_counts_as_change(self, tmp_path):
+        pointer = tmp_path / "CURRENT"
+        _touch(pointer, "v-1", 1_000_000_000)
+        reloads = []
+        watcher = ModelWatcher(lambda: [pointer], lambda: reloads.append(1), start=False)
+        # Same content size and mtime, but a new file swapped in over the old one
+        replacement = tmp_path / ".CURRENT.tmp"
+        _touch(replacement, "v-2", 1_000_000_000)
+        os.replace(replacement, pointer)
+        watcher.check()
+        assert watcher.check()
+        assert reloads == [1]
+
+    def test_close_stops_thread(self, tmp_path):
+        watcher = ModelWatcher(lambda: [tmp_path / "x"], lambda: None, interval_seconds=0.01)
+        watcher.close()
+        assert not watcher._thread.is_alive()
@@ -0,0 +1,40 @@
+"""Tests for the catastrophic-backtracking analyser."""
+
+import re
+
+from detector.patterns.injection_patterns import ALL_PATTERNS
+from detector.patterns.redos import EXPONENTIAL, POLYNOMIAL, analyze
+
+
+def severities(regex: str) -> set[str]:
+    return {f.severity for f in analyze(re.compile(regex, re.IGNORECASE | re.DOTALL))}
+
+
+class TestAnalyze:
+    def test_nested_repeats_are_exponential(self):
+        assert EXPONENTIAL in severities(r"x(a+)+y")
+        assert EXPONENTIAL in severities(r"x(\w+\s?)*y")
+
+    def test_atomic_inner_repeat_is_not_exponential(self):
+        assert EXPONENTIAL not in severities(r"x(?>a+)+y")
+
+    def test_overlapping_adjacent_repeats(self):
+        assert severities(r"what\s+if\s+.*ignore") == {POLYNOMIAL}
+        assert severities(r"x\s*:\s*y") == set()
+
+    def test_any_character_run_followed_by_more(self):
+        assert severities(r'"""[\s\S]*?system') == {POLYNOMIAL}
+        # Trailing runs are fine: the match ends as soon as the prefix matched
+        assert severities(r"system.*") == set()
+
+    def test_tempered_run_is_linear(self):
+        assert severities(r'"""(?:(?!""")[\s\S])*?system') == set()
+
+    def test_leading_run_needs_a_guard(self):
+        assert severities(r"#{3,}\s*system") == {POLYNOMIAL}
+        assert severities(r"(?<!#)#{3,}+\s*system") == set()
+        assert severities(r"^#+\s*system") == set()
+
+    def test_library_has_no_exponential_patterns(self):
+        for p in ALL_PATTERNS:
+            assert EXPONENTIAL not in {f.severity for f in analyze(p.pattern)}, p.name
@@ -0,0 +1,52 @@
+"""Tests for startup and pre-fork loading of the API services."""
+
+import asyncio
+import gc
+
+import pytest
+
+from detector import services
+from detector.config import settings
+
+
+@pytest.fixture
+def fresh(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "db_path", str(tmp_path / "results.db"))
+    asyncio.run(services.stop())
+    yield
+    asyncio.run(services.stop())
+    services._preloaded = None
+    gc.unfreeze()
+    gc.enable()
+
+
+class TestServices:
+    def test_warm_up_records_each_phase(self, fresh):
+        services.warm_up()
+        assert services.ready
+        assert {"import", "patterns", "model", "database", "warm_up", "total"} <= set(
+            services.startup_ms
+        )
+        assert services.get() is services.get()
+
+    def test_built_services_reuse_preloaded_ensemble(self, fresh):
+        services.preload()
+        assert gc.get_freeze_count() > 0 and not gc.isenabled()
+        services.after_fork()
+        assert gc.isenabled()
+        assert services.get().ensemble is services._preloaded
+
+    def test_failed_startup_is_not_retried(self, fresh, monkeypatch):
+        builds = []
+
+        def broken_build():
+            builds.append(1)
+            raise OSError("database is locked")
+
+        monkeypatch.setattr(services, "_build", broken_build)
+        with pytest.raises(OSError):
+            services.warm_up()
+        with pytest.raises(services.StartupError, match="database is locked"):
+            services.get()
+        assert builds == [1]
+        assert services.status() == "failed" and not services.ready
@@ -0,0 +1,113 @@
+"""Tests for the SQLite analysis store."""
+
+import sqlite3
+import threading
+
+import pytest
+
+from detector.storage.sqlite_store import AnalysisStore
+
+
+def _row(verdict: str = "CLEAN", category: str = "none", timestamp: str | None = None) -> dict:
+    row = {
+        "prompt_hash": "abc",
+        "prompt_length": 10,
+        "verdict": verdict,
+        "confidence": 0.1,
+        "primary_category": category,
+        "triggered_detectors": "",
+        "explanation": "",
+        "latency_ms": 1.0,
+    }
+    if timestamp:
+        row["timestamp"] = timestamp
+    return row
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = AnalysisStore(str(tmp_path / "test.db"))
+    yield store
+    store.close()
+
+
+class TestAnalysisStore:
+    def test_wal_mode(self, store):
+        mode = store._reader().execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == "wal"
+
+    def test_save_and_read(self, store):
+        store.save(**_row("CLEAN"))
+        store.save_many([_row("MALICIOUS"), _row("SUSPICIOUS")])
+        stats = store.get_stats()
+        assert stats["total_analyzed"] == 3
+        assert stats["total_malicious"] == 1
+        assert len(store.get_recent(limit=10)) == 3
+
+    def test_reader_connection_per_thread(self, store):
+        store.save(**_row())
+        main_conn = store._reader()
+        assert store._reader() is main_conn
+
+        seen = {}
+
+        def read():
+            seen["conn"] = store._reader()
+            seen["total"] = store.get_stats()["total_analyzed"]
+
+        thread = threading.Thread(target=read)
+        thread.start()
+        thread.join()
+        assert seen["conn"] is not main_conn
+        assert seen["total"] == 1
+
+    def test_rollups_track_inserts_and_deletes(self, store):
+        store.save_many([
+            _row("CLEAN", timestamp="2024-01-01T10:15:00+00:00"),
+            _row("MALICIOUS", "role_override", "2024-01-01T10:45:00+00:00"),
+            _row("SUSPICIOUS", "role_override", "2024-01-01T11:05:00+00:00"),
+            _row("MALICIOUS", "instruction_leak", "2024-01-02T09:00:00+00:00"),
+        ])
+        assert store.get_stats() == {
+            "total_analyzed": 4,
+            "total_clean": 1,
+            "total_suspicious": 1,
+            "total_malicious": 2,
+            "top_categories": {"role_override": 2, "instruction_leak": 1},
+        }
+        assert store.get_verdict_timeseries()[0] == {
+            "date": "2024-01-02", "verdict": "MALICIOUS", "count": 1,
+        }
+        hourly = {(r["hour"], r["verdict"]): r["count"] for r in store.get_hourly_timeseries()}
+        assert hourly[("2024-01-01T10:00:00", "MALICIOUS")] == 1
+        assert hourly[("2024-01-01T11:00:00", "SUSPICIOUS")] == 1
+
+        with store._writer as conn:
+            conn.execute("DELETE FROM analyses WHERE primary_category = 'instruction_leak'")
+        stats = store.get_stats()
+        assert stats["total_malicious"] == 1
+        assert stats["top_categories"] == {"role_override": 2}
+        assert all(r["date"] != "2024-01-02" for r in store.get_verdict_timeseries())
+
+    def test_rollups_backfilled_for_existing_database(self, tmp_path):
+        db_path = str(tmp_path / "legacy.db")
+        store = AnalysisStore(db_path)
+        store.save_many([_row("CLEAN"), _row("MALICIOUS", "role_override")])
+        store.close()
+        # Simulate a database created before rollups existed
+        conn = sqlite3.connect(db_path)
+        conn.executescript("""
+            DROP TRIGGER analyses_rollup_insert;
+            DROP TRIGGER analyses_rollup_delete;
+            DELETE FROM verdict_totals;
+            DELETE FROM category_totals;
+        """)
+        conn.close()
+
+        stats = AnalysisStore(db_path).get_stats()
+        assert stats["total_analyzed"] == 2
+        assert stats["top_categories"] == {"role_override": 1}
+
+    def test_rejects_unknown_synchronous_mode(self, tmp_path):
+        with pytest.raises(ValueError):
+            AnalysisStore(str(tmp_path / "test.db"), synchronous="SOMETIMES")
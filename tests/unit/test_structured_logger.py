@@ -0,0 +1,112 @@
+"""Tests for the background structured-log writer."""
+
+import io
+import json
+import logging
+import threading
+import time
+
+import pytest
+
+from detector.logging_.schemas import AnalysisLogEvent
+from detector.logging_.structured_logger import AsyncJSONHandler, JSONFormatter
+
+
+class BlockingStream(io.StringIO):
+    """Stream whose writes wait until released, to fill the handler's buffer."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.writes = 0
+
+    def write(self, text: str) -> int:
+        self.release.wait()
+        self.writes += 1
+        return super().write(text)
+
+
+def _logger(handler: logging.Handler, name: str) -> logging.Logger:
+    handler.setFormatter(JSONFormatter())
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+
+def _messages(stream: io.StringIO) -> list[str]:
+    return [json.loads(line)["message"] for line in stream.getvalue().splitlines()]
+
+
+class TestAsyncJSONHandler:
+    def test_writes_batched_json_lines(self):
+        stream = BlockingStream()
+        handler = AsyncJSONHandler(stream, max_batch=100)
+        logger = _logger(handler, "test.async.batched")
+        event = AnalysisLogEvent.from_analysis(
+            "abc", 10, "CLEAN", 0.1, "none", [], {"regex": 0.0}, 1.0
+        )
+        logger.info("first", extra={"event_data": event})
+        for i in range(9):
+            logger.info("record %d", i)
+        stream.release.set()
+        handler.flush()
+
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert [line["message"] for line in lines] == ["first"] + [f"record {i}" for i in range(9)]
+        assert lines[0]["event"]["prompt_hash"] == "abc"
+        # The first record may have been picked up alone before the rest arrived
+        assert stream.writes <= 2
+        assert handler.stats() == {"backlog": 0, "written": 10, "dropped": 0}
+        handler.close()
+
+    def test_full_buffer_drops_newest(self):
+        stream = BlockingStream()
+        handler = AsyncJSONHandler(stream, max_queue=5, max_batch=1)
+        logger = _logger(handler, "test.async.newest")
+        logger.info("record 0")
+        while handler.stats()["backlog"]:
+            time.sleep(0.001)
+        for i in range(1, 20):
+            logger.info("record %d", i)
+        stream.release.set()
+        handler.flush()
+
+        # The blocked writer holds record 0; records 1-5 fill the buffer
+        assert _messages(stream) == [f"record {i}" for i in range(6)]
+        assert handler.stats()["dropped"] == 14
+        handler.close()
+
+    def test_full_buffer_drops_oldest(self):
+        stream = BlockingStream()
+        handler = AsyncJSONHandler(stream, max_queue=5, max_batch=1, drop_policy="oldest")
+        logger = _logger(handler, "test.async.oldest")
+        logger.info("record 0")
+        # Wait until the writer holds the first record, blocked on the stream
+        while handler.stats()["backlog"]:
+            time.sleep(0.001)
+        for i in range(1, 20):
+            logger.info("record %d", i)
+        stream.release.set()
+        handler.flush()
+
+        assert _messages(stream) == ["record 0"] + [f"record {i}" for i in range(15, 20)]
+        assert handler.stats()["dropped"] == 14
+        handler.close()
+
+    def test_slow_stream_does_not_block_emit(self):
+        stream = BlockingStream()
+        handler = AsyncJSONHandler(stream)
+        logger = _logger(handler, "test.async.slow")
+        started = time.perf_counter()
+        for i in range(100):
+            logger.info("record %d", i)
+        assert time.perf_counter() - started < 1.0
+        stream.release.set()
+        handler.close()
+        assert len(_messages(stream)) == 100
+
+    def test_rejects_unknown_drop_policy(self):
+        with pytest.raises(ValueError):
+            AsyncJSONHandler(io.StringIO(), drop_policy="random")
@@ -0,0 +1,34 @@
+"""Tests for long-prompt windowing."""
+
+import pytest
+
+from detector.engine.windows import merge, plan, split
+
+
+class TestWindows:
+    def test_split_covers_text_with_overlap(self):
+        spans = split(100, 30, 10)
+        assert spans == [(0, 30), (20, 50), (40, 70), (60, 90), (80, 100)]
+
+    def test_every_stretch_up_to_overlap_fits_a_window(self):
+        spans = split(500, 64, 16)
+        for start in range(500 - 16 + 1):
+            assert any(a <= start and start + 16 <= b for a, b in spans), start
+
+    def test_short_text_is_one_window(self):
+        assert split(10, 30, 10) == [(0, 10)]
+
+    def test_overlap_must_be_below_window(self):
+        with pytest.raises(ValueError):
+            split(100, 30, 30)
+
+    def test_budget_keeps_leading_windows(self):
+        windows = plan(100, 30, 10, budget_chars=70)
+        assert windows.spans == [(0, 30), (20, 50)]
+        assert windows.total == 5
+        assert windows.unscored_from == 50
+        assert plan(100, 30, 10, budget_chars=0).unscored_from is None
+
+    def test_merge_joins_overlapping_ranges(self):
+        merged = merge([(20, 50, 0.5), (0, 30, 0.8), (60, 90, 0.4)])
+        assert merged == [(0, 50, 0.8), (60, 90, 0.4)]